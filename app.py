@@ -12,7 +12,6 @@ from src.ui import (
     render_command_center,
     render_right_column,
 )
-from src.pages import render_page as _render_page
 
 # Flow only (state + actions)
 from src.flow import (
@@ -20,7 +19,7 @@ from src.flow import (
     refresh_calendar,
     submit_plan,
     toggle_camera,
-    add_to_calendar,
+    add_drafts_to_calendar,
     reject_draft,
     begin_reconnect,
     clear_reconnect,
@@ -115,10 +114,13 @@ if not st.session_state.get("authenticated"):
 # 2) If still not authenticated -> show PIN login UI
 if not st.session_state.get("authenticated"):
     # init (NO new keys without init)
-    st.session_state.setdefault("login_email", "")
-    st.session_state.setdefault("login_pin", "")
-    st.session_state.setdefault("login_msg", "")
-    st.session_state.setdefault("do_clear_login_widgets", False)
+    for _k, _v in {
+        "login_email": "",
+        "login_pin": "",
+        "login_msg": "",
+        "do_clear_login_widgets": False,
+    }.items():
+        st.session_state.setdefault(_k, _v)
 
     # Safe clear (must happen before widgets render)
     if st.session_state.get("do_clear_login_widgets"):
@@ -218,6 +220,11 @@ if not st.session_state.get("authenticated"):
 
     st.stop()
 
+# Authenticated from here on. The page modules (and, lazily inside flow, the
+# src.brain / src.gcal SDK stacks) are only imported past the login gate, so
+# the PIN screen's cold start stays "just Streamlit".
+from src.pages import render_page as _render_page
+
 # -----------------------
 # ACTIVE USER — re-point per-user data files on every render.
 # Streamlit Cloud restarts wipe module globals; re-applying from session_state
@@ -337,7 +344,7 @@ else:
     left, right = st.columns([2.2, 1.1], gap="large")
 
     with left:
-        from src.flow import apply_deferred_ui_resets
+        from src.flow import apply_deferred_ui_resets, process_train_brain_feedback
         apply_deferred_ui_resets()
 
         render_command_center(
@@ -347,14 +354,14 @@ else:
             checkin_item=checkin_item,
             on_checkin_yes=checkin_yes,
             on_checkin_no_with_feedback=checkin_no_with_feedback,
+            on_brain_save=process_train_brain_feedback,
         )
-        from src.flow import process_train_brain_feedback
-        process_train_brain_feedback()
 
     with right:
         render_right_column(
             drafts=st.session_state.get("pending_events") or [],
             calendar=st.session_state.get("calendar_events") or [],
-            on_add=add_to_calendar,
+            on_add=add_drafts_to_calendar,
             on_reject=reject_draft,
+            calendar_view=st.session_state.get("calendar_view"),
         )
\ No newline at end of file
@@ -23,13 +23,29 @@ from __future__ import annotations
 
 import base64
 import datetime
+import hashlib
+import io
 from datetime import timedelta
 import json
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 from src.llm_router import LLMRouter
 
+try:
+    # Optional: orjson parses the multi-KB model payloads several times faster,
+    # and encodes the per-turn memory/pending/calendar/ideas dumps likewise.
+    from orjson import OPT_NON_STR_KEYS as _ORJSON_OPTS
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as _json_loads
+except ImportError:
+    _orjson_dumps = None
+    _json_loads = json.loads
+
 # NOTE: Model constants and provider selection live in src/llm_router.py only.
 # To upgrade/swap models: edit llm_router.py — never this file.
 
@@ -40,37 +56,76 @@ from src.prompts import (
 )
 
 _FINAL_REPLY_LINE = ""
+# json.dumps defaults to ", " / ": " — the padding is pure prompt tokens and payload.
+_COMPACT = (",", ":")
+
+
+def _json_dumps(obj: Any) -> str:
+    """Compact, non-ASCII-escaped JSON text; orjson when installed (same output)."""
+    if _orjson_dumps is not None:
+        try:
+            return _orjson_dumps(obj, option=_ORJSON_OPTS).decode()
+        except TypeError:
+            pass  # e.g. ints past 64 bits — let the stdlib have a go
+    return json.dumps(obj, ensure_ascii=False, separators=_COMPACT)
+
+
 # -----------------------------
 # Time helpers (no pytz)
 # -----------------------------
-def _get_tz_now() -> datetime.datetime:
-    """Return timezone-aware 'now' for America/New_York without requiring pytz."""
+@lru_cache(maxsize=1)
+def _get_tz():
+    """ZoneInfo for America/New_York, resolved once (None if tzdata is missing)."""
     try:
         from zoneinfo import ZoneInfo  # Python 3.9+
 
-        tz = ZoneInfo("America/New_York")
-        return datetime.datetime.now(tz)
+        return ZoneInfo("America/New_York")
     except Exception:
-        # Fallback (keeps app running)
-        return datetime.datetime.now()
+        return None
+
+
+def _get_tz_now() -> datetime.datetime:
+    """Return timezone-aware 'now' for America/New_York without requiring pytz."""
+    tz = _get_tz()
+    # Fallback to naive local time (keeps app running)
+    return datetime.datetime.now(tz) if tz else datetime.datetime.now()
 
 
 def _next_7_days_cheatsheet(now: datetime.datetime) -> str:
+    return _cheatsheet_for(now.date().isoformat())
+
+
+@lru_cache(maxsize=4)
+def _cheatsheet_for(date_iso: str) -> str:
+    """Only the calendar date matters, so the table is built once per day."""
+    today = datetime.date.fromisoformat(date_iso)
     lines = ["REFERENCE DATES (Use these for 'Tomorrow', 'Next Saturday', etc):"]
-    lines.append(f"- TODAY ({now.strftime('%A')}): {now.strftime('%Y-%m-%d')}")
+    lines.append(f"- TODAY ({today.strftime('%A')}): {date_iso}")
     for i in range(1, 8):
-        d = now + datetime.timedelta(days=i)
-        lines.append(f"- {d.strftime('%A')} (+{i} days): {d.strftime('%Y-%m-%d')}")
+        d = today + datetime.timedelta(days=i)
+        lines.append(f"- {d.strftime('%A')} (+{i} days): {d.isoformat()}")
     return "\n".join(lines)
 
 
 def _next_saturday_date(now: datetime.datetime) -> str:
+    return _next_saturday_for(now.date().isoformat())
+
+
+@lru_cache(maxsize=4)
+def _next_saturday_for(date_iso: str) -> str:
+    today = datetime.date.fromisoformat(date_iso)
     # weekday: Monday=0 ... Sunday=6, Saturday=5
-    days_ahead = (5 - now.weekday()) % 7
+    days_ahead = (5 - today.weekday()) % 7
     if days_ahead == 0:
         days_ahead = 7  # "Next Saturday" must be future Saturday
-    ns = now + datetime.timedelta(days=days_ahead)
-    return ns.strftime("%Y-%m-%d")
+    return (today + datetime.timedelta(days=days_ahead)).isoformat()
+
+_ABC_HEADER_RE = {k: re.compile(rf"\s*\({k}\)\s*") for k in "ABC"}
+_REPLY_EXACTLY_RE = re.compile(r"\n*Reply exactly:\s*schedule\s*[A-C][^\n]*", flags=re.IGNORECASE)
+_OPTIONAL_LINE_RE = re.compile(r"\n*\(Optional:[^\n]*\)", flags=re.IGNORECASE)
+_OPTIONAL_SPAN_RE = re.compile(r"\n*\(Optional:.*?\)", flags=re.IGNORECASE | re.DOTALL)
+_EXTRA_BLANKS_RE = re.compile(r"\n{3,}")
+
 
 def _format_abc_text_for_ui(text: str) -> str:
     """
@@ -83,18 +138,17 @@ def _format_abc_text_for_ui(text: str) -> str:
     t = text.strip()
 
     # Force A/B/C headers to start as separate paragraphs
-    t = re.sub(r"\s*\(A\)\s*", "\n\n(A) ", t)
-    t = re.sub(r"\s*\(B\)\s*", "\n\n(B) ", t)
-    t = re.sub(r"\s*\(C\)\s*", "\n\n(C) ", t)
+    for k, rx in _ABC_HEADER_RE.items():
+        t = rx.sub(f"\n\n({k}) ", t)
 
     # Strip "Reply exactly" line — options are tappable cards, not typed replies
-    t = re.sub(r"\n*Reply exactly:\s*schedule\s*[A-C][^\n]*", "", t, flags=re.IGNORECASE)
+    t = _REPLY_EXACTLY_RE.sub("", t)
 
     # Remove "(Optional: ...)" lines
-    t = re.sub(r"\n*\(Optional:[^\n]*\)", "", t, flags=re.IGNORECASE)
+    t = _OPTIONAL_LINE_RE.sub("", t)
 
     # Clean excess blank lines
-    t = re.sub(r"\n{3,}", "\n\n", t)
+    t = _EXTRA_BLANKS_RE.sub("\n\n", t)
 
     return t.strip()
 
@@ -170,8 +224,7 @@ def _finalize_for_ui(parsed: dict) -> dict:
     # Strip "Reply exactly: schedule A / B / C" from displayed text —
     # options are now tappable cards so this instruction is UI noise.
     txt = parsed.get("text") or ""
-    txt = re.sub(r"\n*Reply exactly:\s*schedule\s*[A-C][^\n]*", "", txt, flags=re.IGNORECASE).strip()
-    txt = re.sub(r"\n*\(Optional:.*?\)", "", txt, flags=re.IGNORECASE | re.DOTALL).strip()
+    txt = _OPTIONAL_SPAN_RE.sub("", _REPLY_EXACTLY_RE.sub("", txt)).strip()
     if txt:
         parsed["text"] = txt
 
@@ -181,7 +234,20 @@ def _finalize_for_ui(parsed: dict) -> dict:
 def _dump_final(parsed: dict) -> str:
     """Always return through finalizer (prevents bypass bugs)."""
     parsed = _finalize_for_ui(parsed)
-    return json.dumps(parsed, ensure_ascii=False)
+    return _json_dumps(parsed)
+
+
+def _speculative_or(fut: Optional[Future], fallback: str) -> str:
+    """
+    The already-paid-for weekend regen's reply when one is in flight, else fallback.
+    A started future can't be cancelled, so early returns use it rather than drop it.
+    """
+    if fut is None:
+        return fallback
+    try:
+        return _dump_final(fut.result())
+    except Exception:
+        return fallback
 
 
 def _is_rate_limited(err: Exception) -> bool:
@@ -205,8 +271,12 @@ def _llm_call(
     Thin wrapper used by all regen helpers.
     `task` matches a key in llm_router.ROUTING_TABLE.
     Default task="regen" → routes to Claude.
+    Every caller only reads the first JSON object, so the reply is streamed
+    and cut off once that object closes.
     """
-    return router.call(task, system=system, user=user, temperature=temperature, max_tokens=max_tokens)
+    return router.call(
+        task, system=system, user=user, temperature=temperature, max_tokens=max_tokens, stop_at_json=True
+    )
 
 
 def _option_to_event(option: Dict[str, Any], now_dt) -> Dict[str, str] | None:
@@ -288,17 +358,28 @@ def _option_to_event(option: Dict[str, Any], now_dt) -> Dict[str, str] | None:
     except Exception:
         return None
 
+_CHOICE_WORD_RE = re.compile(r"\b(?:option\s+|schedule\s+|plan\s+|choose\s+|let\'s do\s+)?([a-c])\b")
+
+
 def _extract_schedule_choice(user_text: str) -> str:
     """Mirroring the updated flow.py logic for continuity."""
     t = (user_text or "").strip().lower()
-    m = re.search(r"\b(?:option\s+|schedule\s+|plan\s+|choose\s+|let\'s do\s+)?([a-c])\b", t)
+    m = _CHOICE_WORD_RE.search(t)
     return m.group(1).upper() if m else ""
 
 # Broaden intent to include choosing an option
-_SCHEDULE_INTENT_RE = re.compile(r"\b(schedule|add|plan|book|create|visit|option|choose)\b", flags=re.IGNORECASE)
+_SCHEDULE_PAT = r"\b(?:schedule|add|plan|book|create|visit|option|choose)\b"
+_SCHEDULE_INTENT_RE = re.compile(_SCHEDULE_PAT, flags=re.IGNORECASE)
 
 _FINAL_SCHEDULE_RE = re.compile(r"(?i)^\s*(?:schedule|plan|add|option|choose)?\s*([A-C])\s*$")
 
+# "schedule A" / "A" anywhere in the text (group 2 is the letter)
+_CHOICE_LETTER_RE = re.compile(r"\b(schedule\s*)?([A-C])\b", flags=re.IGNORECASE)
+_PICKED_LINE_RE = {k: re.compile(rf"\({k}\)\s*([^()]+)", flags=re.IGNORECASE) for k in "ABC"}
+_TIME_LIST_CUE_RE = re.compile(r"\b(time window|time slot|start time|what time|time works)\b", flags=re.IGNORECASE)
+_ABC_SEQUENCE_RE = re.compile(r"\(A\).*\(B\).*\(C\)", flags=re.IGNORECASE | re.DOTALL)
+_TIME_RANGE_RE = re.compile(r"\b\d{1,2}:\d{2}\s*(AM|PM)\s*-\s*\d{1,2}:\d{2}\s*(AM|PM)\b", flags=re.IGNORECASE)
+
 def _is_schedule_choice(user_text: str) -> bool:
     return bool(_FINAL_SCHEDULE_RE.match((user_text or "").strip()))
 
@@ -306,7 +387,7 @@ def _assistant_has_time_choice_prompt(text: str) -> bool:
     t = text or ""
     has_reply_exactly = "reply exactly" in t.lower() and "schedule a" in t.lower() and "schedule b" in t.lower()
     # time range like "10:00 AM - 2:00 PM"
-    has_time_range = bool(re.search(r"\b\d{1,2}:\d{2}\s*(AM|PM)\s*-\s*\d{1,2}:\d{2}\s*(AM|PM)\b", t, flags=re.IGNORECASE))
+    has_time_range = bool(_TIME_RANGE_RE.search(t))
     return has_reply_exactly and has_time_range
 
 
@@ -314,13 +395,23 @@ def _is_schedule_intent(user_text: str) -> bool:
     return bool(_SCHEDULE_INTENT_RE.search((user_text or "").strip()))
 
 
-_GREET_RE = re.compile(
-    r"^\s*(hi|hello|hey|good\s+morning|good\s+afternoon|good\s+evening|hiya)\b",
+_GREET_PAT = r"^\s*(?:hi|hello|hey|good\s+morning|good\s+afternoon|good\s+evening|hiya)\b"
+_WEEKEND_PAT = r"\b(?:weekend|this weekend|sat|saturday|sun|sunday|family day|outing|go out)\b"
+
+# Greeting / weekend / schedule cues in one alternation, so get_coo_response
+# classifies the request in a single scan instead of re-walking it per check.
+_INTENT_RE = re.compile(
+    f"(?P<greet>{_GREET_PAT})|(?P<weekend>{_WEEKEND_PAT})|(?P<schedule>{_SCHEDULE_PAT})",
     flags=re.IGNORECASE,
 )
 
-def _is_greeting(user_text: str) -> bool:
-    return bool(_GREET_RE.search((user_text or "").strip()))
+
+def _classify_intent(user_text: str) -> frozenset:
+    """Subset of {"greet", "weekend", "schedule"} cued in the text."""
+    return frozenset(m.lastgroup for m in _INTENT_RE.finditer((user_text or "").strip()))
+
+
+_UPPER_ABC_RE = re.compile(r"\b[A-C]\b")
 
 
 def _looks_like_banned_scheduling_prompt(text: str) -> bool:
@@ -333,7 +424,7 @@ def _looks_like_banned_scheduling_prompt(text: str) -> bool:
         return False
 
     # If the assistant is asking the user to "schedule" with A/B/C selection, that's a scheduling push.
-    if "reply exactly" in t and "schedule" in t and re.search(r"\b[A-C]\b", t):
+    if "reply exactly" in t and "schedule" in t and _UPPER_ABC_RE.search(t):
         return True
 
     # Generic scheduling prompts without explicit user scheduling intent
@@ -351,53 +442,41 @@ def _looks_like_banned_scheduling_prompt(text: str) -> bool:
 
 
 def _strict_error_json(msg: str) -> str:
-    return json.dumps({"type": "error", "text": msg, "pre_prep": "", "events": []}, ensure_ascii=False)
+    return _json_dumps({"type": "error", "text": msg, "pre_prep": "", "events": []})
 
 
 # -----------------------------
 # JSON parsing / repair
 # -----------------------------
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _try_parse_json(text: str) -> Optional[Dict[str, Any]]:
+    text = (text or "").strip()
     if not text:
         return None
-    text = text.strip()
-
-    # Fast path
-    try:
-        obj = json.loads(text)
-        if isinstance(obj, dict):
-            return obj
-    except Exception:
-        pass
 
-    # Try to extract first {...}
-    extracted = _extract_first_json_object(text)
-    if extracted:
+    # Fast path: only a bare object can parse whole, so fenced or prose-wrapped
+    # replies skip straight to the scan below instead of a doomed full parse.
+    if text[0] == "{" and text[-1] == "}":
         try:
-            obj = json.loads(extracted)
+            obj = _json_loads(text)
             if isinstance(obj, dict):
                 return obj
-        except Exception:
-            return None
-    return None
-
+        except ValueError:
+            pass
 
-def _extract_first_json_object(text: str) -> Optional[str]:
-    """Extract the first top-level JSON object substring (best-effort)."""
-    if not text:
-        return None
+    # Stream-decode from the first "{" and stop at its matching close: one
+    # pass, and braces inside string values don't throw the match off.
     start = text.find("{")
     if start < 0:
         return None
-    depth = 0
-    for i in range(start, len(text)):
-        ch = text[i]
-        if ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                return text[start : i + 1]
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
     return None
 
 
@@ -405,7 +484,11 @@ def _repair_json_with_llm(router: "LLMRouter", model: str, bad_text: str) -> str
     """Uses Groq (fast/cheap) to repair malformed JSON — see llm_router.ROUTING_TABLE."""
     repair_prompt = build_json_repair_prompt(bad_text)
     try:
-        return router.call("repair", system=repair_prompt, user="Fix the JSON.", temperature=0.0, max_tokens=900)
+        # JSON mode on Groq; stop_at_json still applies if this falls back to Claude.
+        return router.call(
+            "repair", system=repair_prompt, user="Fix the JSON.", temperature=0.0, max_tokens=900,
+            stop_at_json=True, json_mode=True,
+        )
     except Exception as e:
         if _is_rate_limited(e):
             return bad_text  # deterministic: no extra LLM calls under 429
@@ -416,10 +499,31 @@ def _repair_json_with_llm(router: "LLMRouter", model: str, bad_text: str) -> str
 # -----------------------------
 # Idea selection helpers (for continuity, NOT tool execution)
 # -----------------------------
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WS_RUN_RE = re.compile(r"\s+")
+# ASCII fast path for _NON_ALNUM_RE: a C-level table lookup per character.
+_NON_ALNUM_TABLE = str.maketrans({
+    c: " " for c in map(chr, range(128))
+    if not (("a" <= c <= "z") or c.isdigit() or c.isspace())
+})
+_ABC_OPTION_RE = re.compile(r"(^|\n)\s*\(?\s*[A-C]\s*\)?\s*[\).:-]", flags=re.IGNORECASE)
+# Numeric ("1) Title") and A/B/C ("(A) Title" / "A) Title") option markers in
+# one alternation, so the history scan tests both list styles in a single pass.
+# The two forms can't both match a line; group 1 (the digit) tells which did.
+_ANY_OPTION_RE = re.compile(r"(^|\n)\s*(?:\d+\s*[\).]|\(?\s*[A-C]\s*\)?\s*[\).:-])", flags=re.IGNORECASE)
+_ANY_OPTION_LINE_RE = re.compile(
+    r"\s*(?:(\d+)\s*[\).]|\(?\s*[A-C]\s*\)?\s*[\).:-])\s*(.+?)\s*$", flags=re.IGNORECASE
+)
+_TRAILING_PAREN_RE = re.compile(r"\s*\([^)]*\)\s*$")
+_OPTION_NUMBER_RE = re.compile(r"\b(option\s*)?(\d)\b")
+
+
 def _normalize_choice_text(s: str) -> str:
     s = (s or "").lower()
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    if s.isascii():
+        return " ".join(s.translate(_NON_ALNUM_TABLE).split())
+    s = _NON_ALNUM_RE.sub(" ", s)
+    s = _WS_RUN_RE.sub(" ", s).strip()
     return s
 
 
@@ -441,9 +545,7 @@ def _extract_option_titles_from_history(history: List[Dict[str, Any]]) -> List[s
             if not txt:
                 continue
 
-            has_numeric = re.search(r"(^|\n)\s*\d+\s*[\).]", txt)
-            has_abc = re.search(r"(^|\n)\s*\(?\s*[A-C]\s*\)?\s*[\).:-]", txt, flags=re.IGNORECASE)
-            if has_numeric or has_abc:
+            if _ANY_OPTION_RE.search(txt):
                 last = txt
                 break
         except Exception:
@@ -452,30 +554,24 @@ def _extract_option_titles_from_history(history: List[Dict[str, Any]]) -> List[s
     if not last:
         return []
 
-    options: List[str] = []
-
-    # Numeric options: 1) Title
+    # Numeric options (1) Title) win; A/B/C options ((A) Title  OR  A) Title) otherwise.
+    numeric: List[str] = []
+    abc: List[str] = []
     for line in last.splitlines():
-        m = re.match(r"\s*(\d+)\s*[\).]\s*(.+?)\s*$", line)
+        m = _ANY_OPTION_LINE_RE.match(line)
         if not m:
             continue
-        title = m.group(2).strip()
-        title = re.sub(r"\s*\([^)]*\)\s*$", "", title).strip()
-        if title:
-            options.append(title)
-
-    # A/B/C options: (A) Title  OR  A) Title
-    if not options:
-        for line in last.splitlines():
-            m = re.match(r"\s*\(?\s*([A-C])\s*\)?\s*[\).:-]\s*(.+?)\s*$", line, flags=re.IGNORECASE)
-            if not m:
-                continue
-            title = m.group(2).strip()
-            title = re.sub(r"\s*\([^)]*\)\s*$", "", title).strip()
-            if title:
-                options.append(title)
+        title = _TRAILING_PAREN_RE.sub("", m.group(2).strip()).strip()
+        if not title:
+            continue
+        if m.group(1) is None:
+            abc.append(title)
+        else:
+            numeric.append(title)
+            if len(numeric) >= 5:
+                break
 
-    return options[:5]
+    return (numeric or abc)[:5]
 
 
 def _match_selected_idea_title(user_text: str, options) -> Optional[str]:
@@ -487,7 +583,7 @@ def _match_selected_idea_title(user_text: str, options) -> Optional[str]:
         return None
 
     # Handle "1" / "option 1" style selections
-    m = re.search(r"\b(option\s*)?(\d)\b", ut)
+    m = _OPTION_NUMBER_RE.search(ut)
     if m:
         idx = int(m.group(2)) - 1
         if 0 <= idx < len(options):
@@ -530,6 +626,11 @@ def _get_last_assistant_text(chat_history: List[Dict[str, Any]]) -> str:
     return ""
 
 
+_SEL_WEEKEND_RE = re.compile(r"\bweekend\b|\bSaturday\b|\bSunday\b|\bouting\b|pick one\b", flags=re.IGNORECASE)
+_SEL_CONFIRM_RE = re.compile(r"\bschedule it\b|\bchange the time\b|\bcancel\b", flags=re.IGNORECASE)
+_SEL_TIME_RE = re.compile(r"\bwhat time\b|\btime works\b|\bstart time\b|\btime window\b", flags=re.IGNORECASE)
+
+
 def _match_selected_option(user_text: str, last_assistant_text: str) -> Dict[str, str]:
     """
     Routes schedule A/B/C (or plain A/B/C) based on what the last assistant message contained.
@@ -545,7 +646,7 @@ def _match_selected_option(user_text: str, last_assistant_text: str) -> Dict[str
         return res
 
     # Accept "schedule A" or just "A"
-    m = re.search(r"\b(schedule\s*)?([A-C])\b", ut, flags=re.IGNORECASE)
+    m = _CHOICE_LETTER_RE.search(ut)
     if not m:
         return res
 
@@ -554,21 +655,19 @@ def _match_selected_option(user_text: str, last_assistant_text: str) -> Dict[str
 
     # --- Priority 1: weekend outing (check BEFORE generic A/B/C fallback) ---
     # Claude's weekend response always contains Saturday/Sunday/weekend — match that first
-    if re.search(r"\bweekend\b|\bSaturday\b|\bSunday\b|\bouting\b|pick one\b", last, flags=re.IGNORECASE):
+    if _SEL_WEEKEND_RE.search(last):
         return {"kind": "weekend_choice", "choice": choice}
 
     # --- Priority 2: confirm choice (schedule it / change time / cancel) ---
-    if re.search(r"\bschedule it\b|\bchange the time\b|\bcancel\b", last, flags=re.IGNORECASE):
+    if _SEL_CONFIRM_RE.search(last):
         return {"kind": "confirm_choice", "choice": choice}
 
     # --- Priority 3: time window question ---
-    if re.search(r"\bwhat time\b|\btime works\b|\bstart time\b|\btime window\b", last, flags=re.IGNORECASE):
+    if _SEL_TIME_RE.search(last):
         return {"kind": "time_choice", "choice": choice}
 
     # --- Fallback: generic A/B/C list → time_choice (safe loop-buster) ---
-    if ("(A)" in last and "(B)" in last and "(C)" in last) or re.search(
-        r"(^|\n)\s*\(?\s*[A-C]\s*\)?\s*[\).:-]", last, flags=re.IGNORECASE
-    ):
+    if ("(A)" in last and "(B)" in last and "(C)" in last) or _ABC_OPTION_RE.search(last):
         return {"kind": "time_choice", "choice": choice}
 
     return res
@@ -579,7 +678,11 @@ def _extract_last_assistant_question(chat_history: List[Dict[str, Any]]) -> Opti
     Best-effort extraction of the last assistant question for continuity:
     Returns dict: {"question_text": "...", "question_kind": "time|date|location|generic"}.
     """
-    last = _get_last_assistant_text(chat_history)
+    return _question_from_text(_get_last_assistant_text(chat_history))
+
+
+def _question_from_text(last: str) -> Optional[Dict[str, str]]:
+    """_extract_last_assistant_question for an already-resolved last assistant text."""
     if not last:
         return None
 
@@ -612,6 +715,16 @@ def _extract_last_assistant_question(chat_history: List[Dict[str, Any]]) -> Opti
     return {"question_text": q_text, "question_kind": kind}
 
 
+_ANSWER_CHOICE_RE = re.compile(r"(?i)(schedule\s*)?[A-C]")
+_ANSWER_CLOCK_RE = re.compile(r"\b\d{1,2}(:\d{2})?\s*(am|pm)?\b", flags=re.IGNORECASE)
+# Fixed whole-word vocabularies: a set lookup per token, not a regex walk.
+_ANSWER_DAYPARTS = frozenset({"morning", "afternoon", "evening", "tonight"})
+_ANSWER_DAYS = frozenset({
+    "today", "tomorrow", "sat", "saturday", "sun", "sunday", "mon", "tue", "wed", "thu", "fri",
+})
+_ISO_DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+
 def _looks_like_answer(user_text: str, q_kind: str) -> bool:
     ut = (user_text or "").strip()
     if not ut:
@@ -619,20 +732,20 @@ def _looks_like_answer(user_text: str, q_kind: str) -> bool:
     q_kind = (q_kind or "generic").lower()
 
     # If user replied with A/B/C or a simple token, treat as answer for continuity
-    if re.fullmatch(r"(?i)(schedule\s*)?[A-C]", ut) or re.fullmatch(r"(?i)[A-C]", ut):
+    if _ANSWER_CHOICE_RE.fullmatch(ut):
         return True
 
     # Time-ish answers
     if q_kind == "time":
-        return bool(re.search(r"\b\d{1,2}(:\d{2})?\s*(am|pm)?\b", ut, flags=re.IGNORECASE)) or bool(
-            re.search(r"\bmorning\b|\bafternoon\b|\bevening\b|\btonight\b", ut, flags=re.IGNORECASE)
-        )
+        if _ANSWER_CLOCK_RE.search(ut):
+            return True
+        return not _ANSWER_DAYPARTS.isdisjoint(_normalize_choice_text(ut).split())
 
     # Date-ish answers
     if q_kind == "date":
-        return bool(
-            re.search(r"\b(today|tomorrow|sat|saturday|sun|sunday|mon|tue|wed|thu|fri)\b", ut, flags=re.IGNORECASE)
-        ) or bool(re.search(r"\b\d{4}-\d{2}-\d{2}\b", ut))
+        if not _ANSWER_DAYS.isdisjoint(_normalize_choice_text(ut).split()):
+            return True
+        return bool(_ISO_DATE_RE.search(ut))
 
     # Generic: short replies likely answers
     return len(ut.split()) <= 6
@@ -645,6 +758,9 @@ def _default_end_time(start_dt: datetime.datetime, minutes: int = 60) -> datetim
     return start_dt + datetime.timedelta(minutes=minutes)
 
 
+_CLOCK_AMPM_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b", flags=re.IGNORECASE)
+
+
 def _parse_tomorrow_time(user_text: str, now: datetime.datetime) -> Optional[datetime.datetime]:
     """
     Very light parser used only for schema safety. The model is primary.
@@ -657,7 +773,7 @@ def _parse_tomorrow_time(user_text: str, now: datetime.datetime) -> Optional[dat
     if "tomorrow" not in ut:
         return None
 
-    m = re.search(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b", ut)
+    m = _CLOCK_AMPM_RE.search(ut)
     if not m:
         return None
 
@@ -694,6 +810,8 @@ def _ensure_event_schema(parsed: Dict[str, Any], user_request: str, now: datetim
         events_in = []
 
     events_out: List[Dict[str, str]] = []
+    # (start, end) read from the user text — parsed on first need, at most once per call.
+    fallback_times: Optional[Tuple[str, str]] = None
     for ev in events_in:
         if not isinstance(ev, dict):
             continue
@@ -706,14 +824,15 @@ def _ensure_event_schema(parsed: Dict[str, Any], user_request: str, now: datetim
         # If model gave no times but it tried to create an event, keep schema valid (but do not guess).
         # We only fill if we can parse a clear "tomorrow <time>" from user text as a safety fallback.
         if not start_time or not end_time:
-            dt = _parse_tomorrow_time(user_request, now)
-            if dt:
-                start_time = dt.strftime("%Y-%m-%dT%H:%M:%S")
-                end_time = _default_end_time(dt, 60).strftime("%Y-%m-%dT%H:%M:%S")
-            else:
-                # Keep empty strings (schema-valid). Flow/UI should gate execution anyway.
-                start_time = start_time or ""
-                end_time = end_time or ""
+            if fallback_times is None:
+                dt = _parse_tomorrow_time(user_request, now)
+                fallback_times = (
+                    (dt.strftime("%Y-%m-%dT%H:%M:%S"), _default_end_time(dt, 60).strftime("%Y-%m-%dT%H:%M:%S"))
+                    if dt else ("", "")
+                )
+            if fallback_times[0]:
+                start_time, end_time = fallback_times
+            # else: keep empty strings (schema-valid). Flow/UI should gate execution anyway.
 
         events_out.append(
             {
@@ -729,15 +848,20 @@ def _ensure_event_schema(parsed: Dict[str, Any], user_request: str, now: datetim
 
 
 # -----------------------------
-# Weekend detection + regen
+# Weekend regen (weekend cues are matched by _classify_intent)
 # -----------------------------
-_WEEKEND_HINT_RE = re.compile(
-    r"\b(weekend|this weekend|sat|saturday|sun|sunday|family day|outing|go out)\b", flags=re.IGNORECASE
-)
+_CANT_RE = re.compile(r"\b(can't|cannot|unable to)\b", flags=re.IGNORECASE)
+_SHOWN_TITLE_RE = re.compile(r"\([A-C]\)\s+([^\n]+)")
+
 
+# A reply's leading "type" value, readable from the first few streamed tokens.
+_LEADING_TYPE_RE = re.compile(r'^\s*(?:```(?:json)?\s*)?\{\s*"type"\s*:\s*"([^"\\]*)"', flags=re.IGNORECASE)
 
-def _is_weekend_outing_request(user_text: str) -> bool:
-    return bool(_WEEKEND_HINT_RE.search(user_text or ""))
+
+def _opens_as_non_question(text: str) -> bool:
+    """True once the reply's leading "type" has arrived and isn't "question"."""
+    m = _LEADING_TYPE_RE.match(text or "")
+    return bool(m) and m.group(1).lower() != "question"
 
 
 def _dead_end_output(parsed: Dict[str, Any], user_request: str = "") -> bool:
@@ -763,7 +887,7 @@ def _dead_end_output(parsed: Dict[str, Any], user_request: str = "") -> bool:
         return True
 
     # "I can't" style dead ends
-    if re.search(r"\b(can't|cannot|unable to)\b", txt.lower()) and t != "conflict":
+    if t != "conflict" and _CANT_RE.search(txt):
         return True
 
     return False
@@ -776,7 +900,7 @@ def _extract_shown_idea_titles(chat_history: List[Dict[str, Any]]) -> List[str]:
         try:
             if (msg.get("role") or "").lower() != "assistant":
                 continue
-            for m in re.finditer(r"\([A-C]\)\s+([^\n]+)", msg.get("content") or ""):
+            for m in _SHOWN_TITLE_RE.finditer(msg.get("content") or ""):
                 t = m.group(1).strip()
                 if t and t.lower() != "custom" and len(t) > 3 and t not in titles:
                     titles.append(t)
@@ -795,8 +919,11 @@ def _regen_dynamic_weekend_options(
     chat_history: Optional[List[Dict[str, Any]]] = None,
     missions_dump: str = "[]",
     feedback_dump: str = "[]",
+    avoid_ideas: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    avoid_ideas = _extract_shown_idea_titles(chat_history or [])
+    # get_coo_response already walked the history for these; only rescan if not given.
+    if avoid_ideas is None:
+        avoid_ideas = _extract_shown_idea_titles(chat_history or [])
     prompt = build_weekend_regen_prompt({
         "user_request": user_request,
         "current_location": current_location or "",
@@ -838,36 +965,111 @@ def _regen_dynamic_weekend_options(
 # -----------------------------
 # Misc helpers
 # -----------------------------
+# Vision input budget: longest edge in px and JPEG quality. Image tokens scale
+# with pixel area, and Q80 is visually lossless for receipts/flyers/schedules.
+_IMAGE_MAX_PX = 1024
+_IMAGE_JPEG_QUALITY = 80
+# Recent encodings by pixel-content digest: an attachment stays on the submit
+# box across turns, and hashing its pixels is far cheaper than resize + JPEG.
+# encode_image runs on _SPECULATIVE_POOL threads shared by every session, so
+# each lookup/insert+evict on the cache happens under _IMAGE_B64_CACHE_LOCK.
+_IMAGE_B64_CACHE: "OrderedDict[bytes, str]" = OrderedDict()
+_IMAGE_B64_CACHE_SIZE = 8
+_IMAGE_B64_CACHE_LOCK = threading.Lock()
+
+
 def encode_image(image) -> str:
     """Encode a PIL image or raw bytes to base64 JPEG string."""
     if image is None:
         return ""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        try:
+            return base64.b64encode(image).decode("ascii")
+        except Exception:
+            return ""
     try:
         # PIL Image
-        import io
-
+        h = hashlib.blake2b(image.tobytes(), digest_size=16)
+        h.update(f"{image.mode}:{image.size}".encode())
+        if image.mode in ("P", "PA"):
+            h.update(bytes(image.getpalette() or ()))  # same indices, other colours
+        key = h.digest()
+        with _IMAGE_B64_CACHE_LOCK:
+            cached = _IMAGE_B64_CACHE.get(key)
+            if cached is not None:
+                _IMAGE_B64_CACHE.move_to_end(key)
+                return cached
+
+        if max(image.size) > _IMAGE_MAX_PX:
+            image = image.copy()
+            image.thumbnail((_IMAGE_MAX_PX, _IMAGE_MAX_PX))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")  # PNG/RGBA scans can't be saved as JPEG
         buf = io.BytesIO()
-        image.save(buf, format="JPEG")
-        return base64.b64encode(buf.getvalue()).decode("utf-8")
+        # No optimize pass: it only trims a few % of bytes, and image tokens are
+        # billed on pixel area, not payload size.
+        image.save(buf, format="JPEG", quality=_IMAGE_JPEG_QUALITY, optimize=False)
+        # getbuffer() hands b64encode the JPEG bytes without getvalue()'s copy.
+        b64 = base64.b64encode(buf.getbuffer()).decode("ascii")
+        with _IMAGE_B64_CACHE_LOCK:
+            _IMAGE_B64_CACHE[key] = b64
+            if len(_IMAGE_B64_CACHE) > _IMAGE_B64_CACHE_SIZE:
+                _IMAGE_B64_CACHE.popitem(last=False)
+        return b64
     except Exception:
-        try:
-            # raw bytes
-            return base64.b64encode(image).decode("utf-8")
-        except Exception:
-            return ""
+        return ""  # not a usable image; the call goes ahead without it
+
+
+_MULTIPLE_RE = re.compile(r"\b(two|three|multiple|few)\b", flags=re.IGNORECASE)
 
 
 def _user_provided_time(user_text: str) -> bool:
-    return bool(re.search(r"\b\d{1,2}(:\d{2})?\s*(am|pm)\b", user_text or "", flags=re.IGNORECASE))
+    return bool(_CLOCK_AMPM_RE.search(user_text or ""))
 
 
 def _user_requested_multiple(user_text: str) -> bool:
-    return bool(re.search(r"\b(two|three|multiple|few)\b", user_text or "", flags=re.IGNORECASE))
+    return bool(_MULTIPLE_RE.search(user_text or ""))
+
+
+# Prompt history budget: last N turns verbatim (each clipped), plus one line
+# recapping the user's earlier requests. Bounds input tokens however long the
+# session (or the merged backend DB history) gets.
+_HISTORY_WINDOW = 6
+_HISTORY_MSG_CHARS = 700
+_HISTORY_RECAP_TURNS = 6
+_HISTORY_RECAP_CHARS = 80
+_ROLE_LABELS = {"user": "USER", "assistant": "ASSISTANT", "system": "SYSTEM"}
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = str(text or "")
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def _build_history_txt(chat_history: List[Dict[str, Any]]) -> str:
+    # Index the tail directly: chat_history[:-W] would copy the whole log first.
+    split = max(0, len(chat_history) - _HISTORY_WINDOW)
+    recent = chat_history[split:]
+    older = chat_history[max(0, split - _HISTORY_RECAP_TURNS * 2):split]
+
+    lines = []
+    earlier = [
+        _clip(m.get("content"), _HISTORY_RECAP_CHARS)
+        for m in older
+        if (m.get("role") or "") == "user" and (m.get("content") or "").strip()
+    ]
+    if earlier:
+        lines.append("EARLIER (user asked): " + " | ".join(earlier))
+    for m in recent:
+        role = m.get("role") or ""
+        label = _ROLE_LABELS.get(role) or role.upper()
+        lines.append(f"{label}: {_clip(m.get('content'), _HISTORY_MSG_CHARS)}")
+    return "\n".join(lines)
 
 
 def _safe_json_dumps(obj: Any, default: str = "[]") -> str:
     try:
-        return json.dumps(obj, ensure_ascii=False)
+        return _json_dumps(obj)
     except Exception:
         return default
 
@@ -1057,6 +1259,22 @@ def _regen_force_plan_from_selection(
 # Main entrypoint
 # -----------------------------
 
+_ABC_BLOCK_SPLIT_RE = re.compile(r"(?=\n?\s*\([A-C]\))")
+_BLOCK_KEY_RE = re.compile(r"\(([A-C])\)\s*(.+?)(?:\n|$)", re.IGNORECASE)
+_BLOCK_WHEN_RE = re.compile(r"(?:When|Time\s+window|Time):\s*(.+?)(?:\n|$)", re.IGNORECASE)
+_BLOCK_WHERE_RE = re.compile(r"Where:\s*(.+?)(?:\n|$)", re.IGNORECASE)
+_BLOCK_NOTES_RE = re.compile(r"Notes:\s*(.+?)(?:\n|$)", re.IGNORECASE)
+_BLOCK_DURATION_RE = re.compile(r"Duration:\s*(\d+(?:\.\d+)?)\s*hour", re.IGNORECASE)
+_WHEN_BULLET_RE = re.compile(
+    r"(Sat|Sun|Saturday|Sunday)[^•]*•\s*(\d{1,2}:\d{2}\s*(?:AM|PM))\s*[–\-]\s*(\d{1,2}:\d{2}\s*(?:AM|PM))",
+    re.IGNORECASE,
+)
+_WHEN_COMPACT_RE = re.compile(
+    r"(Sat|Sun)[a-z]*\s+(\d{1,2}:\d{2}\s*(?:AM|PM))\s*[–\-]\s*(\d{1,2}:\d{2}\s*(?:AM|PM))",
+    re.IGNORECASE,
+)
+
+
 def _parse_abc_options_from_text(text: str, now_dt: datetime.datetime) -> List[Dict[str, Any]]:
     """
     Fallback parser: extract A/B/C options from formatted assistant text.
@@ -1067,30 +1285,27 @@ def _parse_abc_options_from_text(text: str, now_dt: datetime.datetime) -> List[D
     if not text:
         return options
     # Pattern: (A) Title\n    When: Day/Date • HH:MM AM – HH:MM PM\n    Where: ...
-    blocks = re.split(r"(?=\n?\s*\([A-C]\))", text)
+    blocks = _ABC_BLOCK_SPLIT_RE.split(text)
     for block in blocks:
-        m_key = re.search(r"\(([A-C])\)\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+        m_key = _BLOCK_KEY_RE.search(block)
         if not m_key:
             continue
         key = m_key.group(1).upper()
         title = m_key.group(2).strip()
         # Extract time window: supports "When:", "Time window:", and "Time:" prefixes
         # Covers: Claude live output ("When:"), rate-limit fallback ("Time window:")
-        m_when = re.search(
-            r"(?:When|Time\s+window|Time):\s*(.+?)(?:\n|$)",
-            block, re.IGNORECASE
-        )
+        m_when = _BLOCK_WHEN_RE.search(block)
         if not m_when:
             continue
         when_str = m_when.group(1).strip()
         # Extract Where
-        m_where = re.search(r"Where:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+        m_where = _BLOCK_WHERE_RE.search(block)
         location = m_where.group(1).strip() if m_where else ""
         # Extract Notes
-        m_notes = re.search(r"Notes:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+        m_notes = _BLOCK_NOTES_RE.search(block)
         notes = m_notes.group(1).strip() if m_notes else ""
         # Fallback: use Duration: as a hint when time can't be parsed from when_str
-        m_dur_hint = re.search(r"Duration:\s*(\d+(?:\.\d+)?)\s*hour", block, re.IGNORECASE)
+        m_dur_hint = _BLOCK_DURATION_RE.search(block)
         dur_hint = float(m_dur_hint.group(1)) if m_dur_hint else 0
 
         # Convert when_str to _option_to_event-compatible time_window
@@ -1098,16 +1313,7 @@ def _parse_abc_options_from_text(text: str, now_dt: datetime.datetime) -> List[D
         #   "Saturday, March 7 • 9:00 AM – 12:00 PM"  (Claude live)
         #   "Sat 9:00 AM–12:00 PM"                     (compact)
         #   "Sat 11:00 AM–1:00 PM"                     (rate-limit fallback)
-        m_bullet = (
-            re.search(
-                r"(Sat|Sun|Saturday|Sunday)[^•]*•\s*(\d{1,2}:\d{2}\s*(?:AM|PM))\s*[–\-]\s*(\d{1,2}:\d{2}\s*(?:AM|PM))",
-                when_str, re.IGNORECASE
-            ) or
-            re.search(
-                r"(Sat|Sun)[a-z]*\s+(\d{1,2}:\d{2}\s*(?:AM|PM))\s*[–\-]\s*(\d{1,2}:\d{2}\s*(?:AM|PM))",
-                when_str, re.IGNORECASE
-            )
-        )
+        m_bullet = _WHEN_BULLET_RE.search(when_str) or _WHEN_COMPACT_RE.search(when_str)
 
         if not m_bullet:
             continue
@@ -1141,6 +1347,21 @@ def _parse_abc_options_from_text(text: str, now_dt: datetime.datetime) -> List[D
 
     return options
 
+
+# Keys given to bare-string idea options when get_coo_response normalises them.
+_OPTION_KEYS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Shared pool for LLM calls issued speculatively alongside the primary "brain"
+# call. Module-level so the worker threads outlive a single turn.
+_SPECULATIVE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="coo-speculative")
+
+
+@lru_cache(maxsize=4)
+def _get_router(api_key: str, groq_key: str) -> LLMRouter:
+    """One router per key pair, so the SDK clients' HTTP pools survive across turns."""
+    return LLMRouter(anthropic_key=api_key, groq_key=groq_key)
+
+
 def get_coo_response(
     api_key: str,
     user_request: str,
@@ -1170,6 +1391,9 @@ def get_coo_response(
 
     # Keep the exact original user input for intent checks (do not mutate)
     original_user_request = (user_request or '').strip()
+    # "schedule A" / bare letter in the untouched input — scanned once, read by
+    # both the forced-draft gate and the guessed-time exemption below.
+    _m_choice = _CHOICE_LETTER_RE.search(original_user_request)
 
     # Normalize None -> empty structures (type-safe)
     memory = memory or []
@@ -1177,12 +1401,9 @@ def get_coo_response(
     pending_events = pending_events or []
     chat_history = chat_history or []
 
-    router = LLMRouter(anthropic_key=api_key, groq_key=groq_key or "")
+    router = _get_router(api_key or "", groq_key or "")
 
     now = _get_tz_now()
-    current_time_str = now.strftime("%A, %B %d, %Y at %I:%M %p")
-    cheat_sheet = _next_7_days_cheatsheet(now)
-    next_saturday = _next_saturday_date(now)
 
     # -----------------------------
     # Route: option continuity (ideas + A/B/C)
@@ -1205,10 +1426,9 @@ def get_coo_response(
 
     # Normalise: ensure every item in idea_options is a dict (not a bare string).
     # _extract_option_titles_from_history returns List[str]; all other paths return List[dict].
-    _LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     idea_options = [
         opt if isinstance(opt, dict)
-        else {"key": _LETTERS[i] if i < len(_LETTERS) else str(i+1),
+        else {"key": _OPTION_KEYS[i] if i < len(_OPTION_KEYS) else str(i+1),
               "title": str(opt), "time_window": "", "duration_hours": 0,
               "notes": "", "location": ""}
         for i, opt in enumerate(idea_options)
@@ -1220,7 +1440,7 @@ def get_coo_response(
         selected_idea = _match_selected_idea_title(user_request, idea_options) or ""
 
     # Dialog continuation: treat short replies as answers to last assistant question (prevents restarting)
-    last_q = _extract_last_assistant_question(chat_history)
+    last_q = _question_from_text(last_assistant_text)
     continuation_hint = ""
     if last_q and _looks_like_answer(user_request, last_q.get("question_kind", "generic")):
         continuation_hint = (
@@ -1240,8 +1460,7 @@ def get_coo_response(
     # Loop-stopper: if user selects time options, mirror the chosen assistant line (no hardcoded times)
     if sel["kind"] == "time_choice" and sel["choice"]:
         try:
-            patt = rf"\({sel['choice'].lower()}\)\s*([^()]+)"
-            mm = re.search(patt, last_assistant_text, flags=re.IGNORECASE)
+            mm = _PICKED_LINE_RE[sel["choice"].upper()].search(last_assistant_text)
             if mm:
                 picked = mm.group(1).strip().strip(".")
                 if picked:
@@ -1286,25 +1505,33 @@ def get_coo_response(
         user_request = f"Please create a calendar event for option {sel['choice']} that I just selected."
 
     # -----------------------------
-    # Context for prompts
+    # Context for prompts (only reached when an LLM call follows)
     # -----------------------------
+    # Vision turns: resize + JPEG + base64 on a worker while the prompt is assembled.
+    image_f = _SPECULATIVE_POOL.submit(encode_image, image_context) if image_context is not None else None
+
+    current_time_str = now.strftime("%A, %B %d, %Y at %I:%M %p")
+    cheat_sheet = _next_7_days_cheatsheet(now)
+    next_saturday = _next_saturday_date(now)
+
     # Keep recent history small (prompt efficiency)
     history_txt = ""
     if chat_history:
         try:
-            history_txt = "\n".join(
-                [f"{(m.get('role','') or '').upper()}: {m.get('content','') or ''}" for m in chat_history[-6:]]
-            )
+            history_txt = _build_history_txt(chat_history)
         except Exception:
             history_txt = ""
 
     memory_dump = _safe_json_dumps(memory, default="[]")
     pending_dump = _safe_json_dumps(pending_events, default="[]")
+    # Serialized once here; the main prompt and every _regen_* rebuild reuse it.
+    # flow.py already sends a pre-rendered string — pass that through untouched.
+    calendar_dump = calendar_data if isinstance(calendar_data, str) else _safe_json_dumps(calendar_data, default="[]")
 
     # Normalize ideas safely
     if ideas_summary is None:
         try:
-            ideas_summary = json.loads(ideas_dump or "[]")
+            ideas_summary = _json_loads(ideas_dump or "[]")
             if not isinstance(ideas_summary, list):
                 ideas_summary = []
         except Exception:
@@ -1324,7 +1551,7 @@ def get_coo_response(
         "cheat_sheet": cheat_sheet,
         "next_saturday": next_saturday,
         "current_location": current_location,
-        "calendar_data": calendar_data,
+        "calendar_data": calendar_dump,
         "pending_dump": pending_dump,
         "memory_dump": memory_dump,
         "history_txt": history_txt,
@@ -1352,7 +1579,8 @@ def get_coo_response(
     system_prompt = build_system_prompt(ctx)
 
     # Greetings must NEVER trigger weekend routing or scheduling.
-    if _is_greeting(user_request) and (not _is_schedule_intent(user_request)) and (not _is_weekend_outing_request(user_request)):
+    intent = _classify_intent(user_request)
+    if "greet" in intent and "schedule" not in intent and "weekend" not in intent:
         system_prompt += (
             "\n\nGREETING MODE: The user greeted you. "
             "Return type='chat' with a friendly response and one short follow-up question. "
@@ -1362,6 +1590,38 @@ def get_coo_response(
     # model is passed to helpers for signature compat (router handles actual model selection)
     model = "router"
 
+    # BUG-13: Exempt direct schedule requests that mention Saturday/Sunday
+    # (e.g. "plan lab work on Saturday at 8am") — those have full intent+time,
+    # they are NOT outing picker requests.
+    _has_time = _user_provided_time(user_request)
+    _is_direct_schedule = "schedule" in intent and _has_time
+
+    # Weekend outing requests fall back to the A/B/C regen whenever the primary
+    # reply is weak, which used to cost a second full round-trip. Start the regen
+    # now, alongside the primary call. A started call can't be cancelled, so the
+    # error exits below return its reply; it's only ignored when the primary fits.
+    weekend_regen_f = None
+    if "weekend" in intent and not _is_direct_schedule:
+        weekend_regen_f = _SPECULATIVE_POOL.submit(
+            _regen_dynamic_weekend_options,
+            router=router,
+            model=model,
+            user_request=user_request,
+            current_location=current_location,
+            memory_dump=memory_dump,
+            ideas_dump=ideas_dump,
+            chat_history=chat_history,
+            missions_dump=ctx.get("missions_dump", "[]"),
+            feedback_dump=ctx.get("feedback_dump", "[]"),
+            avoid_ideas=_avoid_shown,
+        )
+
+    # With the regen in flight, a primary reply that opens as anything but a
+    # question is already lost to the weekend gate — hang up on it early.
+    # Not when the forced time-choice plan below might claim the turn first.
+    _may_force_time_plan = bool(_m_choice or sel.get("choice")) and _is_schedule_intent(original_user_request)
+    stop_when = _opens_as_non_question if weekend_regen_f is not None and not _may_force_time_plan else None
+
     # user_content: str for text turns; list for vision (router handles encoding)
     user_content = user_request or " "
 
@@ -1369,7 +1629,7 @@ def get_coo_response(
     # LLM call
     # -----------------------------
     try:
-        image_b64 = encode_image(image_context) if image_context is not None else None
+        image_b64 = image_f.result() if image_f is not None else None
         raw_text = router.call(
             "brain",
             system=system_prompt,
@@ -1377,23 +1637,27 @@ def get_coo_response(
             temperature=0.6,
             max_tokens=1024,
             image_b64=image_b64,
+            stop_at_json=True,
+            stop_when=stop_when,
         )
         if not raw_text:
             raise ValueError("Empty response from router")
     except Exception as e:
         if _is_rate_limited(e):
-            return json.dumps(
+            return _speculative_or(weekend_regen_f, _json_dumps(
                 {
                     "type": "chat",
                     "text": "I'm getting rate-limited right now. Please resend your last message in ~30 seconds.",
                     "pre_prep": "",
                     "events": [],
-                },
-                ensure_ascii=False,
-            )
-        return _strict_error_json(str(e))
+                }
+            ))
+        return _speculative_or(weekend_regen_f, _strict_error_json(str(e)))
 
 
+    if stop_when is not None and _opens_as_non_question(raw_text):
+        return _dump_final(weekend_regen_f.result())
+
     # -----------------------------
     # Parse + repair
     # -----------------------------
@@ -1406,7 +1670,7 @@ def get_coo_response(
             parsed = None
 
     if not isinstance(parsed, dict):
-        return _strict_error_json("I couldn't process that. Please try again.")
+        return _speculative_or(weekend_regen_f, _strict_error_json("I couldn't process that. Please try again."))
 
     # Enforce schema
     parsed = _ensure_event_schema(parsed, user_request, now)
@@ -1417,11 +1681,10 @@ def get_coo_response(
         # but the model returns chat/confirmation or empty events, force a one-shot regen to a plan+events.
         # This also covers cases where sel.kind fails to detect time_choice but the last assistant message
         # clearly contains a time window A/B/C list.
-        _m_choice = re.search(r"\b(schedule\s*)?([A-C])\b", original_user_request, flags=re.IGNORECASE)
         _choice_letter = (_m_choice.group(2).upper() if _m_choice else (sel.get('choice') or '')).upper()
         _looks_like_time_list = bool(
-            re.search(r"\b(time window|time slot|start time|what time|time works)\b", last_assistant_text, flags=re.IGNORECASE)
-            and re.search(r"\(A\).*\(B\).*\(C\)", last_assistant_text, flags=re.IGNORECASE | re.DOTALL)
+            _TIME_LIST_CUE_RE.search(last_assistant_text)
+            and _ABC_SEQUENCE_RE.search(last_assistant_text)
         )
         _is_time_choice = bool(
             (_choice_letter and sel.get('kind') == 'time_choice') or (_choice_letter and _looks_like_time_list)
@@ -1458,7 +1721,7 @@ def get_coo_response(
     # -----------------------------
     # Safety gate: prevent scheduling prompts when user didn't ask to schedule
     # -----------------------------
-    if (not _is_weekend_outing_request(user_request)) and (not _is_schedule_intent(user_request)):
+    if "weekend" not in intent and "schedule" not in intent:
         # If assistant tries to push scheduling or time selection, regenerate as chat.
         if _looks_like_banned_scheduling_prompt(parsed.get("text", "")) or (parsed.get("type") in {"plan", "question", "confirmation", "conflict"} and "schedule" in (parsed.get("text") or "").lower()):
             safe_chat = _regen_safe_chat_no_scheduling(router, model, ctx, user_request)
@@ -1470,26 +1733,13 @@ def get_coo_response(
 
     # -----------------------------
     # Weekend enforcement: must be a clean A/B/C question; regen if weak
-    # BUG-13: Exempt direct schedule requests that mention Saturday/Sunday
-    # (e.g. "plan lab work on Saturday at 8am") — those have full intent+time,
-    # they are NOT outing picker requests.
+    # (the regen was already started next to the primary call above)
     # -----------------------------
-    _is_direct_schedule = _is_schedule_intent(user_request) and _user_provided_time(user_request)
-    if _is_weekend_outing_request(user_request) and not _is_direct_schedule:
+    if weekend_regen_f is not None:
         has_abc = ("(A)" in txt and "(B)" in txt and "(C)" in txt)
-        if _dead_end_output(parsed, user_request=user_request) or (t != "question") or (not has_abc):
-            regen = _regen_dynamic_weekend_options(
-                router=router,
-                model=model,
-                user_request=user_request,
-                current_location=current_location,
-                memory_dump=memory_dump,
-                ideas_dump=ideas_dump,
-                chat_history=chat_history,
-                missions_dump=ctx.get("missions_dump", "[]"),
-                feedback_dump=ctx.get("feedback_dump", "[]"),
-            )
-            return _dump_final(regen)
+        # Cheap shape checks first; the dead-end heuristics only matter for an A/B/C question.
+        if (t != "question") or (not has_abc) or _dead_end_output(parsed, user_request=user_request):
+            return _dump_final(weekend_regen_f.result())
 
     # -----------------------------
     # BUG-09: If user already gave us title + day + time, skip ALL follow-up questions.
@@ -1497,8 +1747,8 @@ def get_coo_response(
     # Exempt: weekend outing requests (those need the A/B/C picker — returned earlier).
     # -----------------------------
     if (
-        _is_schedule_intent(user_request)
-        and _user_provided_time(user_request)
+        "schedule" in intent
+        and _has_time
         and parsed.get("type") == "question"
         and not _is_direct_schedule
     ):
@@ -1510,7 +1760,7 @@ def get_coo_response(
     # If the model returns a question without the required A/B/C + final reply line,
     # regenerate a tight A/B/C question to prevent UI "empty options" experiences.
     # -----------------------------
-    if _is_schedule_intent(user_request) and parsed.get("type") == "question":
+    if "schedule" in intent and parsed.get("type") == "question":
         qtxt = (parsed.get("text") or "")
         has_abc = ("(A)" in qtxt and "(B)" in qtxt and "(C)" in qtxt)
         # has_reply check removed — "Reply exactly" line is stripped from display
@@ -1524,10 +1774,10 @@ def get_coo_response(
     # Prevent guessed-time scheduling (plan with events but user didn't specify time)
     # Exempt: option selections (schedule A/B/C) — those carry an implicit time commitment
     # -----------------------------
-    _is_option_selection = bool(re.search(r"\b(schedule\s*)?[A-C]\b", original_user_request, re.IGNORECASE)) \
+    _is_option_selection = bool(_m_choice) \
                            and sel.get("kind") in ("weekend_choice", "time_choice")
     if t == "plan" and events and not _is_option_selection:
-        if not _user_provided_time(user_request) and not _user_requested_multiple(user_request):
+        if not _has_time and not _user_requested_multiple(user_request):
             q = _regen_time_question(router, model, ctx, user_request)
             return _dump_final(q)
         
@@ -1,38 +1,37 @@
+import hashlib
 import json
 import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 import streamlit as st
-from PIL import Image
-import json, re
 
 from dateutil import parser as dtparser
 
-from src.utils import (
-    get_pending_review,
-    snooze_mission,
-    complete_mission_review,
-)
+try:
+    # Optional: orjson decodes the brain reply and encodes the per-turn
+    # ideas/missions/feedback dumps several times faster (same text out).
+    from orjson import OPT_NON_STR_KEYS as _ORJSON_OPTS
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as _json_loads
+except ImportError:
+    _orjson_dumps = None
+    _json_loads = json.loads
 
 
 # --- INTERNAL IMPORTS ---
-from src.brain import get_coo_response
-from src.gcal import (
-    get_upcoming_events_list,
-    get_events_range,
-    add_event_to_calendar,
-    delete_event,
-    start_device_flow,
-    poll_device_flow,
-    save_token_from_device_flow
-)
+# src.brain (anthropic/groq SDKs), src.gcal (googleapiclient) and PIL are
+# imported inside the handlers that need them, so the login screen and
+# check-in reruns never pay their import cost.
 from src.utils import (
-    MISSION_FILE,
-    MEMORY_FILE,
     purge_stale_missions,
     load_memory,
     log_mission_start,
+    log_mission_start_batch,
     upsert_calendar_missions,
     load_feedback_rows,
+    count_memory,
     get_missed_count,
     save_manual_feedback,
     # ✅ used by Check-in Required
@@ -96,8 +95,6 @@ def init_state():
         "calendar_events_all": None,
         "pending_events": [],
         "chat_history": [],
-        "last_result_type": None,
-        "last_result_text": "",
         "device_flow": None,
         "plan_text": "",
         "authenticated": False,
@@ -132,7 +129,8 @@ def run_proactive_checks(trigger: str = "app_load"):
     if not st.session_state.get("authenticated"):
         return
 
-    today = _user_now().date().isoformat()
+    now = _user_now()
+    today = now.date().isoformat()
     if st.session_state.get("last_proactive_date") == today:
         return  # already ran today
 
@@ -158,7 +156,7 @@ def run_proactive_checks(trigger: str = "app_load"):
     except Exception:
         pass
 
-    dow = _user_now().weekday()  # Mon=0 ... Sun=6
+    dow = now.weekday()  # Mon=0 ... Sun=6
     # Only nudge Thu/Fri/Sat/Sun (keeps it “triggered”, not spammy)
     if dow in (3, 4, 5, 6):
         if pref_outing:
@@ -177,65 +175,157 @@ def run_proactive_checks(trigger: str = "app_load"):
         st.session_state.last_proactive_kind = "daily_suggestion"
         return
 
+def _compact_json(obj) -> str:
+    """json.dumps(obj, ensure_ascii=False, separators=(",", ":")), via orjson when installed."""
+    if _orjson_dumps is not None:
+        try:
+            return _orjson_dumps(obj, option=_ORJSON_OPTS).decode()
+        except TypeError:
+            pass  # e.g. ints past 64 bits — let the stdlib have a go
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 def _extract_json(raw):
     if not raw:
         return None
     try:
-        obj = json.loads(raw)
+        obj = _json_loads(raw)
         return obj if isinstance(obj, dict) else None
-    except Exception:
+    except (ValueError, TypeError):
         return None
 
+# Anchor only; the array itself is decoded with raw_decode, which walks it once
+# and stops at its balanced "]" (no greedy [\s\S]* scan to the last bracket).
+_OPTIONS_JSON_RE = re.compile(r"OPTIONS_JSON\s*=\s*(?=\[)")
+_JSON_DECODER = json.JSONDecoder()
+
 def _extract_options_json(pre_prep: str):
     
     if not pre_prep or not isinstance(pre_prep, str):
         return None
-    m = re.search(r"OPTIONS_JSON\s*=\s*(\[[\s\S]*\])", pre_prep)
+
+    m = _OPTIONS_JSON_RE.search(pre_prep)
     if not m:
         return None
     try:
-        arr = json.loads(m.group(1))
+        arr, _ = _JSON_DECODER.raw_decode(pre_prep, m.end())
         return arr if isinstance(arr, list) else None
-    except Exception:
+    except ValueError:
         return None
 
+# Standalone A, B, or C, optionally preceded by common selection words
+_CHOICE_RE = re.compile(r"\b(?:option\s+|schedule\s+|plan\s+|choose\s+|let\'s do\s+)?([a-c])\b")
+_DRAFT_INTENT_RE = re.compile(r"\b(schedule|add|plan|book)\b")
+_QUESTION_PREFIXES = (
+    "what", "whats", "what's", "when", "show", "list", "tell me",
+    "do i", "did i", "am i", "any", "my upcoming", "upcoming schedule",
+    "next event", "next events",
+)
+
 def _extract_schedule_choice(text: str) -> str:
     """Updated to catch natural choices like 'A', 'Option B', or 'let's do C'."""
-    import re
-    t = (text or "").strip().lower()
-    # Look for a standalone A, B, or C, optionally preceded by common selection words
-    m = re.search(r"\b(?:option\s+|schedule\s+|plan\s+|choose\s+|let\'s do\s+)?([a-c])\b", t)
+    m = _CHOICE_RE.search((text or "").strip().lower())
     return m.group(1).upper() if m else ""
 
 # -----------------------
 # 2. LOGIC
 # -----------------------
-def execute_plan_logic(user_text: str, image_obj=None):
-    import json
-    import re
+@lru_cache(maxsize=1)
+def _api_keys():
+    # Looked up once per process (lru_cache never stores the KeyError of a
+    # missing entry, so a fixed secrets.toml is picked up on the next call).
+    return st.secrets["anthropic"]["api_key"], st.secrets["general"]["groq_api_key"]
+
+
+class _UncachedReply(Exception):
+    """Carries an error / rate-limit reply out of _cached_brain without caching it."""
+
+    def __init__(self, raw):
+        super().__init__("uncached brain reply")
+        self.raw = raw
+
+
+def _image_sig(image_obj):
+    if image_obj is None:
+        return None
+    try:
+        return hashlib.sha1(image_obj.tobytes()).hexdigest()
+    except Exception:
+        return uuid.uuid4().hex  # unhashable image: never reuse a reply
+
+
+def _is_failed_reply(data) -> bool:
+    """Unparseable, error-typed or rate-limited Brain reply: never cached or debounced."""
+    return not data or data.get("type") == "error" or "rate-limited" in (data.get("text") or "")
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def _cached_brain(image_sig, now_bucket, _image_obj=None, **kwargs):
+    """
+    get_coo_response memoized on every prompt input (the image by content hash),
+    so re-sending an identical request skips the model call. The prompt is
+    relative to the user's clock ("today", "in 2 hours"), so now_bucket (the
+    user's local minute) is part of the key and a reply never outlives it.
+    Error and rate-limit replies are raised out instead of being cached.
+    """
+    from src.brain import get_coo_response
+
+    raw = get_coo_response(image_obj=_image_obj, **kwargs)
+    if _is_failed_reply(_extract_json(raw)):
+        raise _UncachedReply(raw)
+    return raw
+
+
+def _calendar_prompt_text(cal_events) -> str:
+    """
+    Calendar block for the brain prompt. The event list is only replaced on a
+    refresh, so the rendered text is kept next to the list it came from and
+    reused while that same object is still current.
+    """
+    if not cal_events:
+        return "Calendar Empty or Offline."
+    cached = st.session_state.get("calendar_prompt_cache")
+    if cached and cached[0] is cal_events:
+        return cached[1]
+
+    lines = [f"- {e.get('start_friendly','')}: {e.get('title','')}" for e in cal_events]
+    human = "SCHEDULE (Next 7 Days):\n" + "\n".join(lines)
+    structured = [{"title": e.get("title"), "start": e.get("start_raw"), "end": e.get("end_raw")} for e in cal_events]
+    cal_str = human + "\nJSON:\n" + _compact_json(structured)
+    # Holding the list itself (not its id) means a recycled id can never match.
+    st.session_state["calendar_prompt_cache"] = (cal_events, cal_str)
+    return cal_str
+
+
+def execute_plan_logic(user_text: str, image_obj=None) -> bool:
+    """Runs one Brain turn. Returns False when the turn failed and may be retried as-is."""
     import streamlit as st
 
     # ✅ Idea Inbox capture (must happen before Brain call)
     if handle_idea_inbox_capture(user_text):
-        return
+        return True
+
+    # Keys first: without them there is no brain call, so skip building context.
+    try:
+        api_key, groq_key = _api_keys()
+    except Exception:
+        add_msg("assistant", "⛔ Error: Missing API keys in secrets.toml. Check [anthropic] and [general] blocks.")
+        return False
 
     memory = load_memory(limit=10)
     cal_events = st.session_state.get("calendar_events_all") or st.session_state.get("calendar_events")
 
-    if cal_events:
-        lines = [f"- {e.get('start_friendly','')}: {e.get('title','')}" for e in cal_events]
-        human = "SCHEDULE (Next 7 Days):\n" + "\n".join(lines)
-        structured = [{"title": e.get("title"), "start": e.get("start_raw"), "end": e.get("end_raw")} for e in cal_events]
-        cal_str = human + "\nJSON:\n" + json.dumps(structured, ensure_ascii=False)
-    else:
-        cal_str = "Calendar Empty or Offline."
+    cal_str = _calendar_prompt_text(cal_events)
 
     # ------------------------------------------------------------
     # STRICT drafting gate: ONLY schedule/add/plan (whole words).
     # ------------------------------------------------------------
+    # The A/B/C pick is read once here and reused by the gate, the brain
+    # context and the no-events safety net below.
+    choice = _extract_schedule_choice(user_text)
+
     def _should_create_draft(text: str) -> bool:
         """Updated to catch scheduling intent AND natural option selections."""
-        import re
         t = (text or "").strip().lower()
         if not t:
             return False
@@ -244,29 +334,14 @@ def execute_plan_logic(user_text: str, image_obj=None):
         if "?" in t:
             return False
 
-        question_prefixes = (
-            "what", "whats", "what's", "when", "show", "list", "tell me",
-            "do i", "did i", "am i", "any", "my upcoming", "upcoming schedule",
-            "next event", "next events",
-        )
-        if any(t.startswith(p) for p in question_prefixes):
+        if t.startswith(_QUESTION_PREFIXES):
             return False
 
         # Catch explicit scheduling words OR A/B/C option selections
-        has_intent = bool(re.search(r"\b(schedule|add|plan|book)\b", t))
-        has_choice = bool(re.search(r"\b(?:option\s+|schedule\s+|plan\s+|choose\s+|let\'s do\s+)?([a-c])\b", t))
-        
-        return has_intent or has_choice
+        return bool(choice) or bool(_DRAFT_INTENT_RE.search(t))
 
     schedule_intent = _should_create_draft(user_text)
 
-    try:
-        api_key  = st.secrets["anthropic"]["api_key"]
-        groq_key = st.secrets["general"]["groq_api_key"]
-    except Exception:
-        add_msg("assistant", "⛔ Error: Missing API keys in secrets.toml. Check [anthropic] and [general] blocks.")
-        return
-
     # -----------------------------
     # Contextual Matching: inject relevant ideas (flow -> brain)
     # Standard keys:
@@ -298,12 +373,11 @@ def execute_plan_logic(user_text: str, image_obj=None):
                         cleaned.append({"text": txt})
 
             ideas_summary = cleaned
-            ideas_dump = json.dumps(ideas_summary, ensure_ascii=False)
+            ideas_dump = _compact_json(ideas_summary)
     except Exception:
         ideas_summary = []
         ideas_dump = "[]"
 
-    choice = _extract_schedule_choice(user_text)
     if choice and st.session_state.get("idea_options"):
         # carry selection into brain context so it can turn it into a schedulable plan/question
         st.session_state["selected_idea"] = choice
@@ -311,52 +385,59 @@ def execute_plan_logic(user_text: str, image_obj=None):
         st.session_state["selected_idea"] = ""
 
     # ---- build missions + feedback context ----
+    # Typed excepts: a blanket catch here used to hide a TypeError
+    # (load_feedback_rows takes no limit) and ship "[]" on every call. Read
+    # MISSION_FILE off the module: set_active_user() rebinds it per user.
+    from src import utils as _utils
     try:
-        import json as _json
-        from src.utils import _read_json
-        _m_rows = _read_json(MISSION_FILE)
-        missions_dump = _json.dumps(
+        _m_rows = _utils._read_json(_utils.MISSION_FILE)
+        missions_dump = _compact_json(
             [{"title": m.get("title",""), "status": m.get("status",""), "end_time": m.get("end_time","")}
-             for m in (_m_rows or [])[-20:]], ensure_ascii=False)
-    except Exception:
+             for m in (_m_rows or [])[-20:]])
+    except (TypeError, ValueError, AttributeError):
         missions_dump = "[]"
 
     try:
-        _fb_rows = load_feedback_rows(limit=20)
-        feedback_dump = _json.dumps(_fb_rows or [], ensure_ascii=False)
-    except Exception:
+        _fb_rows = load_feedback_rows()[-20:]
+        feedback_dump = _compact_json(_fb_rows or [])
+    except (TypeError, ValueError):
         feedback_dump = "[]"
 
     # ---- call brain ----
-    raw = get_coo_response(
-    api_key=api_key,
-    groq_key=groq_key,
-    user_request=user_text,
-    memory=memory,
-    calendar_data=cal_str,
-    chat_history=st.session_state.chat_history,
-    image_obj=image_obj,
-    current_location=st.session_state.user_location,
-    ideas_summary=ideas_summary,
-    ideas_dump=ideas_dump,
-
-    # ✅ 2.8A continuity wiring (deterministic)
-    idea_options=st.session_state.get("idea_options") or [],
-    selected_idea=st.session_state.get("selected_idea") or "",
-    missions_dump=missions_dump,
-    feedback_dump=feedback_dump,
-    )
+    try:
+        raw = _cached_brain(
+        image_sig=_image_sig(image_obj),
+        now_bucket=_user_now().strftime("%Y-%m-%dT%H:%M%z"),
+        _image_obj=image_obj,
+        api_key=api_key,
+        groq_key=groq_key,
+        user_request=user_text,
+        memory=memory,
+        calendar_data=cal_str,
+        chat_history=st.session_state.chat_history,
+        current_location=st.session_state.user_location,
+        ideas_summary=ideas_summary,
+        ideas_dump=ideas_dump,
+
+        # ✅ 2.8A continuity wiring (deterministic)
+        idea_options=st.session_state.get("idea_options") or [],
+        selected_idea=st.session_state.get("selected_idea") or "",
+        missions_dump=missions_dump,
+        feedback_dump=feedback_dump,
+        )
+    except _UncachedReply as e:
+        raw = e.raw
     print("BRAIN_RAW:", raw)
     data = _extract_json(raw)
+    if not data:
+        add_msg("assistant", "⚠️ Error: I couldn't process that. Please try again.")
+        return False
+
     # Persist weekend options deterministically (no UI change)
     opts = _extract_options_json(data.get("pre_prep", ""))
     if opts:
         st.session_state["idea_options"] = opts  # existing key used in debug :contentReference[oaicite:9]{index=9}
 
-    if not data:
-        add_msg("assistant", "⚠️ Error: I couldn't process that. Please try again.")
-        return
-
     # add chat entries
     if user_text:
         add_msg("user", user_text)
@@ -399,14 +480,12 @@ def execute_plan_logic(user_text: str, image_obj=None):
     # Safety net: if user said "schedule A/B/C" but brain returned no events,
     # try to build the event directly from persisted idea_options in session state.
     if schedule_intent and not new_events:
-        choice = _extract_schedule_choice(user_text)
         opts = st.session_state.get("idea_options") or []
         if choice and opts:
             for opt in opts:
                 if (opt.get("key") or "").strip().upper() == choice.upper():
                     # Build event from the option's time_window directly
                     try:
-                        import re as _re
                         from dateutil import parser as _dtp
                         from datetime import datetime as _dt, timedelta as _td
                         tw = (opt.get("time_window") or "").replace("—", "–").replace("-", "–")
@@ -453,6 +532,8 @@ def execute_plan_logic(user_text: str, image_obj=None):
     if schedule_intent and new_events:
         st.session_state.pending_events = new_events
 
+    return not _is_failed_reply(data)
+
 def add_msg(role, content):
     st.session_state.chat_history.append({"role": role, "content": content})
     if len(st.session_state.chat_history) > 15:
@@ -489,15 +570,18 @@ def apply_deferred_ui_resets():
     if st.session_state.get("clear_conversation"):
         st.session_state["chat_history"] = []
         st.session_state["clear_conversation"] = False
+        _cached_brain.clear()
+
+
+# Accept: "idea: ...", "Idea: ...", "save idea: ...", "add idea: ..."
+_IDEA_PREFIX_RE = re.compile(r"^\s*(idea|save idea|add idea)\s*:\s*(.+)\s*$", flags=re.IGNORECASE)
 
-import re
 
 def _extract_idea_text(user_text: str) -> str | None:
     if not user_text:
         return None
 
-    # Accept: "idea: ...", "Idea: ...", "save idea: ...", "add idea: ..."
-    m = re.match(r"^\s*(idea|save idea|add idea)\s*:\s*(.+)\s*$", user_text, flags=re.IGNORECASE)
+    m = _IDEA_PREFIX_RE.match(user_text)
     if not m:
         return None
     return (m.group(2) or "").strip() or None
@@ -578,13 +662,21 @@ def process_train_brain_feedback():
 # -----------------------
 # 3. CALLBACKS
 # -----------------------
+# Longest edge (px) of a scanned image before it is handed to the Brain.
+_SCAN_MAX_PX = 1024
+
+def _exec_key(text, img_sig):
+    # Keyed on the chat tail too (history is capped, so its length alone can stall).
+    hist = st.session_state.get("chat_history") or []
+    tail = hist[-1].get("content", "") if hist else ""
+    return hash((text, img_sig, len(hist), tail))
+
 def submit_plan():
     import streamlit as st
     from PIL import Image
 
-    st.session_state.setdefault("plan_text", "")
-    st.session_state.setdefault("show_camera", False)
-    st.session_state.setdefault("clear_plan_text", False)
+    for k, v in {"plan_text": "", "show_camera": False, "clear_plan_text": False}.items():
+        st.session_state.setdefault(k, v)
 
     text = (st.session_state.get("plan_text") or "").strip()
     cam_val = st.session_state.get("cam_input")
@@ -593,13 +685,27 @@ def submit_plan():
     if st.session_state.get("show_camera") and cam_val:
         try:
             img = Image.open(cam_val)
+            # JPEG: let libjpeg decode straight at 1/2–1/8 scale (DCT draft
+            # mode) instead of decoding the full phone-camera frame first.
+            img.draft("RGB", (_SCAN_MAX_PX, _SCAN_MAX_PX))
+            img.thumbnail((_SCAN_MAX_PX, _SCAN_MAX_PX))
         except Exception:
             img = None
 
     if not text and not img:
         return
 
-    execute_plan_logic(text, image_obj=img)
+    # Debounce: the same text/scan re-sent while the conversation hasn't moved
+    # (double-click, or the camera frame still sitting in cam_input) would just
+    # repeat the last Brain call.
+    img_sig = hash(cam_val.getvalue()) if img is not None else None
+    if _exec_key(text, img_sig) == st.session_state.get("_last_exec_key"):
+        st.toast("No change — already answered above.")
+        return
+
+    # Only a real answer arms the debounce; a failed turn must stay retryable.
+    ok = execute_plan_logic(text, image_obj=img)
+    st.session_state["_last_exec_key"] = _exec_key(text, img_sig) if ok else None
 
     # ✅ Defer clear to UI BEFORE widget is created
     st.session_state["clear_plan_text"] = True
@@ -610,6 +716,42 @@ def toggle_camera():
 # -----------------------
 # 4. ACTIONS
 # -----------------------
+class _CalendarOffline(Exception):
+    """Raised out of _fetch_calendar so an offline result is never cached."""
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_calendar(uid: str, tz_name: str):
+    """
+    (upcoming 7-day list, full 7-day range) for uid.
+    Shared across reruns and browser sessions for a minute; tz_name is part of
+    the key because gcal formats start_friendly in the display timezone.
+    Call clear_calendar_cache() after anything that changes the calendar.
+    """
+    from src.gcal import get_upcoming_events_list, get_events_range
+
+    # The 7-day list and the full range are independent Calendar API calls —
+    # run them side by side so a refresh costs one round-trip instead of two.
+    # _user_now() reads session_state, so resolve it on the script thread.
+    now = _user_now()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        upcoming_f = pool.submit(get_upcoming_events_list, user_id=uid, days=7)
+        full_f = pool.submit(get_events_range, uid, now, now + timedelta(days=7))
+        upcoming = upcoming_f.result()
+        try:
+            full = full_f.result()
+        except Exception:
+            full = None
+
+    if upcoming is None:
+        raise _CalendarOffline(uid)
+    return upcoming, full
+
+
+def clear_calendar_cache():
+    _fetch_calendar.clear()
+
+
 def refresh_calendar(force_email=None):
     uid = (force_email or st.session_state.get("user_email") or "").strip().lower()
     if not uid:
@@ -625,36 +767,61 @@ def refresh_calendar(force_email=None):
         _sdtz(_user_tz)
 
     purge_stale_missions()
-    upcoming = get_upcoming_events_list(user_id=uid, days=7)
+
+    try:
+        upcoming, full = _fetch_calendar(uid, _user_tz)
+    except _CalendarOffline:
+        upcoming, full = None, None
+
     if upcoming is not None:
+        from src.ui import project_events
+
         st.session_state.calendar_events = upcoming
+        st.session_state.calendar_view = project_events(upcoming)
         st.session_state.calendar_online = True
 
-        now = _user_now()
         try:
-            full = get_events_range(uid, now, now + timedelta(days=7))
+            if full is None:
+                raise ValueError("range fetch failed")
             st.session_state.calendar_events_all = full
             upsert_calendar_missions(full)
-        except:
+        except Exception:
             st.session_state.calendar_events_all = upcoming
     else:
         st.session_state.calendar_online = False
-run_proactive_checks("calendar_refresh")
 
 def add_to_calendar(ev):
+    add_drafts_to_calendar([ev])
+
+def add_drafts_to_calendar(evs):
+    from src.gcal import add_event_to_calendar
+
     uid = st.session_state.get("user_email", "").strip().lower()
     if not uid:
         add_msg("assistant", "⚠️ Connect your calendar first!")
         return
 
-    ok, msg, eid = add_event_to_calendar(uid, ev)
-    if ok:
-        log_mission_start(ev)
-        st.session_state.pending_events = [x for x in st.session_state.pending_events if x != ev]
+    added, logged, notes = [], [], []
+    for ev in evs:
+        ok, msg, eid = add_event_to_calendar(uid, ev)
+        if ok:
+            added.append(ev)
+            # Tag the mission with the new calendar id so the refresh below sees it
+            # as already tracked — otherwise upsert_calendar_missions() appends a
+            # duplicate and rewrites the mission file a second time.
+            logged.append({**ev, "source_id": eid} if eid else ev)
+            notes.append(f"✅ Added '{ev.get('title')}' to calendar.")
+        else:
+            notes.append(f"⛔ Failed: {msg}")
+
+    if added:
+        # One mission-file rewrite and one calendar refresh for the whole selection.
+        log_mission_start_batch(logged)
+        st.session_state.pending_events = [x for x in st.session_state.pending_events if x not in added]
+        clear_calendar_cache()
         refresh_calendar()
-        add_msg("assistant", f"✅ Added '{ev.get('title')}' to calendar.")
-    else:
-        add_msg("assistant", f"⛔ Failed: {msg}")
+    for note in notes:
+        add_msg("assistant", note)
 
 def reject_draft(ev):
     st.session_state.pending_events = [x for x in st.session_state.pending_events if x != ev]
@@ -672,6 +839,7 @@ def begin_reconnect(email):
     if email:
         st.session_state.user_email = email
         _set_query_user(email)   # ✅ persist across refresh
+    from src.gcal import start_device_flow
     st.session_state.device_flow = start_device_flow()
 
 
@@ -686,6 +854,8 @@ def clear_reconnect():
 
 
 def complete_reconnect():
+    from src.gcal import poll_device_flow, save_token_from_device_flow
+
     flow = st.session_state.get("device_flow")
     if not flow:
         return False, "No flow."
@@ -698,14 +868,20 @@ def complete_reconnect():
     if ok:
         st.session_state.device_flow = None
         _set_query_user(uid)  # ✅ persist across refresh
+        clear_calendar_cache()
         refresh_calendar(force_email=uid)
         return True, msg
     return False, msg
 
-from datetime import datetime
-import streamlit as st
 
-from src.utils import load_feedback_rows, get_missed_count, calculate_reliability_score
+@lru_cache(maxsize=8)
+def _zone(tz_name: str):
+    """ZoneInfo for tz_name, resolved once per name (unknown names raise, uncached)."""
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:
+        from backports.zoneinfo import ZoneInfo  # type: ignore
+    return ZoneInfo(tz_name)
 
 
 # ── Timezone-aware "now" helper ──────────────────────────────────
@@ -718,13 +894,9 @@ def _user_now():
         _tz_name = st.session_state.get("user_tz") or "America/New_York"
     except Exception:
         _tz_name = "America/New_York"
-    try:
-        from zoneinfo import ZoneInfo
-    except ImportError:
-        from backports.zoneinfo import ZoneInfo  # type: ignore
     from datetime import timezone
     try:
-        return datetime.now(ZoneInfo(_tz_name))
+        return datetime.now(_zone(_tz_name))
     except Exception:
         return datetime.now(timezone.utc)
 
@@ -745,9 +917,9 @@ def compute_kpis(user_name: str = "Tushar"):
         events_week = st.session_state.get("calendar_events") or []
 
     try:
-        rows = load_feedback_rows()
+        learnings = count_memory()
     except Exception:
-        rows = []
+        learnings = 0
 
     try:
         missed = int(get_missed_count())
@@ -766,7 +938,7 @@ def compute_kpis(user_name: str = "Tushar"):
         "header_date": now.strftime("%b %d, %Y"),
         "date_label": now.strftime("%b %d"),
         "upcoming_week": len(events_week),
-        "learnings": len(rows),
+        "learnings": learnings,
         "missed": missed,
         "reliability": reliability,
     }
@@ -870,28 +1042,6 @@ def checkin_no_with_feedback(feedback: str = ""):
     add_msg("assistant", f"📝 Saved feedback for '{mission.get('title','Item')}'.")
 
 
-def checkin_submit_feedback():
-    mission, mode = get_checkin_context()
-    if not mission:
-        st.session_state.checkin_feedback_open = False
-        st.session_state.checkin_feedback_text = ""
-        return
-
-    fb = (st.session_state.get("checkin_feedback_text") or "").strip()
-    fb = fb if fb else "Skipped (no details provided)"
-
-    # Save as learning (missed)
-    complete_mission_review(mission["id"], False, fb)
-
-    # Close feedback UI + cleanup
-    st.session_state.checkin_feedback_open = False
-    st.session_state.checkin_feedback_text = ""
-    st.session_state.checkin_reason = ""
-    st.session_state.checkin_reschedule_when = ""
-    st.session_state.checkin_pending_action = None
-
-    add_msg("assistant", f"✅ Noted. I’ll learn from this: '{mission.get('title','Item')}'.")
-
 def checkin_submit_feedback():
     mission, mode = get_checkin_context()
     if not mission:
@@ -983,6 +1133,8 @@ def checkin_reschedule():
     Creates a NEW calendar event (safe) and marks the old mission as missed+rescheduled.
     We avoid editing old past events to reduce risk.
     """
+    from src.gcal import add_event_to_calendar
+
     mission, mode = get_checkin_context()
     if not mission:
         return
@@ -1023,6 +1175,7 @@ def checkin_reschedule():
         st.session_state.checkin_reschedule_when = ""
         st.session_state.checkin_pending_action = None
 
+        clear_calendar_cache()
         refresh_calendar(force_email=uid)
         add_msg("assistant", f"✅ Rescheduled: '{new_event['title']}' added to your calendar.")
     else:
@@ -1034,6 +1187,8 @@ def checkin_delete():
     Deletes the old calendar event only if we have its Calendar ID (source_id).
     Then marks mission as missed+deleted.
     """
+    from src.gcal import delete_event
+
     mission, mode = get_checkin_context()
     if not mission:
         return
@@ -1055,6 +1210,7 @@ def checkin_delete():
 
         if ok:
             complete_mission_review(mission["id"], False, f"Missed. Deleted. Note: {note}")
+            clear_calendar_cache()
             refresh_calendar(force_email=uid)
             add_msg("assistant", f"🗑️ Deleted '{mission.get('title','Item')}' from calendar.")
         else:
@@ -10,10 +10,12 @@ Design goals:
 
 import json
 import os
+import re
 import time
 import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
@@ -138,8 +140,7 @@ def get_calendar_service(user_id: Optional[str] = None):
         # Fallback: per-user local file (testers without Supabase)
         if not token_dict:
             try:
-                import re
-                safe = re.sub(r"[^a-zA-Z0-9_]", "_", user_id.lower())
+                safe = _UNSAFE_PATH_CHAR_RE.sub("_", user_id.lower())
                 local_path = os.path.join("memory", "users", safe, "gcal_token.json")
                 if os.path.exists(local_path):
                     with open(local_path, "r", encoding="utf-8") as _f:
@@ -358,10 +359,12 @@ def save_token_from_device_flow(user_id: str, token_response: Dict[str, Any]) ->
     return True, "✅ Calendar connected! (local storage)"
 
 
+_UNSAFE_PATH_CHAR_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
 def _local_token_path(user_id: str) -> str:
     """Returns per-user token file path."""
-    import re
-    safe = re.sub(r"[^a-zA-Z0-9_]", "_", (user_id or "default").lower())
+    safe = _UNSAFE_PATH_CHAR_RE.sub("_", (user_id or "default").lower())
     user_dir = os.path.join("memory", "users", safe)
     os.makedirs(user_dir, exist_ok=True)
     return os.path.join(user_dir, "gcal_token.json")
@@ -383,6 +386,15 @@ def _save_token_to_local_for_user(user_id: str, token_dict: dict) -> None:
 # Defaults to "America/New_York" if not set — never falls back to server UTC.).
 _DISPLAY_TZ: str | None = None
 
+@lru_cache(maxsize=8)
+def _zone(tz_name: str):
+    """ZoneInfo for tz_name, resolved once per name (unknown names raise, uncached)."""
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:
+        from backports.zoneinfo import ZoneInfo  # type: ignore
+    return ZoneInfo(tz_name)
+
 def set_display_tz(tz_name: str) -> None:
     """Called by flow.refresh_calendar() with the browser-detected timezone."""
     global _DISPLAY_TZ
@@ -401,11 +413,7 @@ def format_friendly_date(iso_str: str) -> str:
         if "T" in iso_str:
             dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
             _tz_name = _DISPLAY_TZ or "America/New_York"   # never fall back to UTC
-            try:
-                from zoneinfo import ZoneInfo
-            except ImportError:
-                from backports.zoneinfo import ZoneInfo  # type: ignore
-            dt = dt.astimezone(ZoneInfo(_tz_name))
+            dt = dt.astimezone(_zone(_tz_name))
             return dt.strftime("%a, %b %d @ %I:%M %p")
         dt = datetime.strptime(iso_str, "%Y-%m-%d")
         return dt.strftime("%a, %b %d (All Day)")
@@ -557,11 +565,7 @@ def add_event_to_calendar(*args, **kwargs) -> Tuple[bool, str, Optional[str]]:
             start_dt = datetime.fromisoformat(start_str)
             if start_dt.tzinfo is None:
                 _tz_name = _DISPLAY_TZ or "America/New_York"
-                try:
-                    from zoneinfo import ZoneInfo as _ZI
-                except ImportError:
-                    from backports.zoneinfo import ZoneInfo as _ZI  # type: ignore
-                start_dt = start_dt.replace(tzinfo=timezone.utc).astimezone(_ZI(_tz_name))
+                start_dt = start_dt.replace(tzinfo=timezone.utc).astimezone(_zone(_tz_name))
 
             end_dt = (
                 datetime.fromisoformat(event.get("end_time"))
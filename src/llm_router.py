@@ -18,10 +18,10 @@ HOW TO UPGRADE MODELS:
 """
 
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Optional
 
 import anthropic
-from groq import Groq
+import json
 import os
 
 # ---------------------------------------------------------------------------
@@ -63,7 +63,17 @@ class LLMRouter:
 
         self._anthropic = anthropic.Anthropic(api_key=self.anthropic_key)
         self._claude = self._anthropic  
-        self._groq      = Groq(api_key=self.groq_key)
+        self._groq_client: Any = None
+
+    @property
+    def _groq(self) -> Any:
+        # Groq only serves repair and rate-limit fallback, so its SDK is imported
+        # and its client built on first use rather than with every router.
+        if self._groq_client is None:
+            from groq import Groq
+
+            self._groq_client = Groq(api_key=self.groq_key)
+        return self._groq_client
 
 
     # ------------------------------------------------------------------
@@ -77,29 +87,38 @@ class LLMRouter:
         temperature: float = 0.6,
         max_tokens: int = 900,
         image_b64: Optional[str] = None,
+        stop_at_json: bool = False,
+        json_mode: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None,
     ) -> str:
         """
         Route a call by task name. Returns raw text string.
         On Claude rate-limit: auto-retries with Groq (if groq_key was provided).
         On any other error: re-raises so brain.py can handle it.
+        stop_at_json=True streams the reply and hangs up as soon as one complete
+        top-level JSON object has arrived, instead of waiting out any trailing text.
+        json_mode=True asks Groq for response_format=json_object (server-validated
+        JSON, never prose); the prompt must mention JSON. Ignored for Claude.
+        stop_when (streamed calls only) sees the opening of the reply as it arrives;
+        returning True hangs up there and returns the partial text.
         """
         provider = ROUTING_TABLE.get(task, "claude")
         user = (user or " ").strip() or " "  # never empty
 
         if provider == "claude":
             try:
-                return self._call_claude(system, user, temperature, max_tokens, image_b64)
+                return self._call_claude(system, user, temperature, max_tokens, image_b64, stop_at_json, stop_when)
             except Exception as e:
                 if self._is_rate_limited(e) and self._groq is not None:
                     # Auto-fallback to Groq on Claude rate-limit
-                    return self._call_groq(system, user, temperature, max_tokens)
+                    return self._call_groq(system, user, temperature, max_tokens, stop_at_json, stop_when=stop_when)
                 raise
 
         # provider == "groq"
         if self._groq is None:
             # No Groq key? Fall back to Claude for repair/fallback tasks
-            return self._call_claude(system, user, temperature, max_tokens)
-        return self._call_groq(system, user, temperature, max_tokens)
+            return self._call_claude(system, user, temperature, max_tokens, stop_at_json=stop_at_json, stop_when=stop_when)
+        return self._call_groq(system, user, temperature, max_tokens, stop_at_json, json_mode, stop_when)
 
     # ------------------------------------------------------------------
     # Static helpers (callable without an instance — used by brain.py's
@@ -119,6 +138,8 @@ class LLMRouter:
         temperature: float,
         max_tokens: int,
         image_b64: Optional[str] = None,
+        stop_at_json: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None,
     ) -> str:
         if image_b64:
             user_content: Any = [
@@ -135,13 +156,19 @@ class LLMRouter:
         else:
             user_content = user
 
-        msg = self._claude.messages.create(
+        kwargs = dict(
             model=CLAUDE_MODEL,
             max_tokens=max_tokens,
             system=system,
             messages=[{"role": "user", "content": user_content}],
             temperature=temperature,
         )
+        if stop_at_json:
+            # Leaving the context manager closes the connection mid-generation.
+            with self._claude.messages.stream(**kwargs) as stream:
+                return _drain_until_json(stream.text_stream, stop_when)
+
+        msg = self._claude.messages.create(**kwargs)
         return (msg.content[0].text or "").strip()
 
     # ------------------------------------------------------------------
@@ -153,7 +180,15 @@ class LLMRouter:
         user: str,
         temperature: float,
         max_tokens: int,
+        stop_at_json: bool = False,
+        json_mode: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None,
     ) -> str:
+        extra: dict = {}
+        if json_mode:
+            # Groq can't stream in JSON mode; the reply is only the object anyway.
+            extra["response_format"] = {"type": "json_object"}
+            stop_at_json = False
         completion = self._groq.chat.completions.create(
             model=GROQ_MODEL,
             messages=[
@@ -162,8 +197,19 @@ class LLMRouter:
             ],
             temperature=temperature,
             max_tokens=max_tokens,
-            stream=False,
+            stream=stop_at_json,
+            **extra,
         )
+        if stop_at_json:
+            try:
+                return _drain_until_json(
+                    ((chunk.choices[0].delta.content or "") for chunk in completion if chunk.choices),
+                    stop_when,
+                )
+            finally:
+                close = getattr(completion, "close", None)
+                if close:
+                    close()
         return (completion.choices[0].message.content or "").strip()
 
     # ------------------------------------------------------------------
@@ -182,3 +228,72 @@ class LLMRouter:
         except Exception:
             pass
         return False
+
+
+# ---------------------------------------------------------------------------
+# Streaming helper
+# ---------------------------------------------------------------------------
+_JSON_DECODER = json.JSONDecoder()
+
+
+# How much of a streamed reply's opening a stop_when predicate gets to see.
+_STOP_WHEN_HEAD_CHARS = 256
+
+
+def _drain_until_json(pieces: Iterable[str], stop_when: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Accumulate streamed text; stop once a complete top-level JSON object
+    decodes. Falls back to the full text otherwise.
+    A running brace depth (string- and escape-aware) tracks the object, so it
+    is decoded once when the outer brace closes rather than on every "}".
+    stop_when, if given, is asked about the first _STOP_WHEN_HEAD_CHARS of the
+    reply after each chunk; True ends the stream with the partial text.
+    """
+    parts: list[str] = []
+    depth = 0
+    in_str = False
+    escaped = False
+    head = ""
+    size = 0   # chars consumed before the current piece
+    start = 0  # offset of the "{" that opened the current top-level object
+    done = False
+    for piece in pieces:
+        if not piece:
+            continue
+        parts.append(piece)
+        if stop_when is not None and len(head) < _STOP_WHEN_HEAD_CHARS:
+            head = (head + piece)[:_STOP_WHEN_HEAD_CHARS]
+            if stop_when(head):
+                break
+        base = size
+        size += len(piece)
+        for i, ch in enumerate(piece):
+            if in_str:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_str = False
+            elif ch == "{":
+                if not depth:
+                    start = base + i
+                depth += 1
+            elif depth and ch == '"':
+                in_str = True
+            elif depth and ch == "}":
+                depth -= 1
+                if not depth:
+                    buf = "".join(parts)
+                    parts = [buf]
+                    try:
+                        _JSON_DECODER.raw_decode(buf, start)
+                        done = True
+                        break
+                    except ValueError:
+                        # Not valid JSON after all (e.g. a brace in leading prose):
+                        # keep scanning for the next top-level object.
+                        continue
+        if done:
+            break
+    return "".join(parts).strip()
@@ -14,6 +14,8 @@ Pages:
 
 from __future__ import annotations
 import re
+from bisect import bisect_left
+from collections import defaultdict
 from datetime import datetime, date, timedelta
 from typing import Any, Dict, List, Optional
 
@@ -139,6 +141,12 @@ _ACTION_RULES = [
     (["yousician", "guitar", "music"],                     [],              "🎸", "Launch Yousician"),
     (["bank", "sip", "invest", "hdfc", "finance"],         [],              "📊", "Check account status"),
 ]
+# Each rule's title keywords as one literal alternation (same substring test
+# as any(k in text ...)), so an event costs one scan per rule, not one per keyword.
+_ACTION_RULE_RES = [
+    (re.compile("|".join(map(re.escape, kws))), emoji, label_tmpl)
+    for kws, _loc_kws, emoji, label_tmpl in _ACTION_RULES
+]
 
 def _quick_actions(today_evs: List[dict]) -> List[dict]:
     """Return up to 5 contextual quick actions based on today's events."""
@@ -147,8 +155,8 @@ def _quick_actions(today_evs: List[dict]) -> List[dict]:
     for ev in today_evs:
         title = (ev.get("title") or "").lower()
         loc   = (ev.get("location") or "").lower()
-        for kws, loc_kws, emoji, label_tmpl in _ACTION_RULES:
-            if any(k in title or k in loc for k in kws):
+        for kw_re, emoji, label_tmpl in _ACTION_RULE_RES:
+            if kw_re.search(title) or kw_re.search(loc):
                 label = (label_tmpl
                          .replace("{title}", ev.get("title","Event"))
                          .replace("{loc}",   ev.get("location","") or ev.get("title","")))
@@ -297,6 +305,9 @@ def _pattern_insights(mission_rows: List[dict], memory_rows: List[dict]) -> List
 # DASHBOARD PAGE
 # ─────────────────────────────────────────────────────────────
 
+_SKIP_WORD_RE = re.compile(r"\b[a-z]{4,}\b")
+
+
 # ── COO Action Plan builder — zero LLM, pattern + schedule aware ──
 def _build_action_plan(
     today_evs: list, mission_rows: list, memory_rows: list, now
@@ -364,7 +375,7 @@ def _build_action_plan(
             # Find most-skipped activity
             skip_words = []
             for m in skipped:
-                skip_words += re.findall(r'\b[a-z]{4,}\b', m.get("mission","").lower())
+                skip_words += _SKIP_WORD_RE.findall(m.get("mission","").lower())
             common = [w for w, _ in Counter(skip_words).most_common(5)
                       if w not in {"this","that","with","from","have","will","the","and","for","your"}]
             if common:
@@ -1030,20 +1041,32 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
     today  = date.today()
 
     # ── helpers ────────────────────────────────────────────────
+    # The metrics, week grid, filters and conflict scan each ask for the same
+    # event's start/end several times per render; parse each one once. Keyed
+    # by id(): every event dict outlives this render, so ids can't be reused.
+    _start_cache: dict = {}
+    _end_cache: dict = {}
+
     def _dt(ev):
-        raw = str(ev.get("start_raw") or ev.get("start_time") or "")
-        try:
-            return datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone()
-        except Exception:
-            return None
+        k = id(ev)
+        if k not in _start_cache:
+            raw = str(ev.get("start_raw") or ev.get("start_time") or "")
+            try:
+                _start_cache[k] = datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone()
+            except Exception:
+                _start_cache[k] = None
+        return _start_cache[k]
 
     def _end_dt(ev):
-        raw = str(ev.get("end_raw") or ev.get("end_time") or "")
-        try:
-            return datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone()
-        except Exception:
-            start = _dt(ev)
-            return start + timedelta(hours=1) if start else None
+        k = id(ev)
+        if k not in _end_cache:
+            raw = str(ev.get("end_raw") or ev.get("end_time") or "")
+            try:
+                _end_cache[k] = datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone()
+            except Exception:
+                start = _dt(ev)
+                _end_cache[k] = start + timedelta(hours=1) if start else None
+        return _end_cache[k]
 
     def _fmt_hour(dt) -> str:
         """Cross-platform time format. Strips leading zero."""
@@ -1071,47 +1094,57 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
 
     week_evs = [e for e in events if _ev_date(e) in week_days]
 
-    # busiest day
-    day_counts: dict = {}
+    # group the week by day once; the metrics and the grid below all read it.
+    # Lookups use .get() so the defaultdict never grows empty days.
+    by_day = defaultdict(list)
     for e in week_evs:
-        d = _ev_date(e)
-        day_counts[d] = day_counts.get(d, 0) + 1
-    busiest_day = max(day_counts, key=lambda d: day_counts[d]) if day_counts else None
+        by_day[_ev_date(e)].append(e)
+
+    # busiest day
+    busiest_day = max(by_day, key=lambda d: len(by_day[d])) if by_day else None
     busiest_label = busiest_day.strftime("%A") if busiest_day else "—"
-    busiest_sub   = f"{day_counts[busiest_day]} events" if busiest_day else ""
+    busiest_sub   = f"{len(by_day[busiest_day])} events" if busiest_day else ""
 
     # free evenings (no events 5 PM-9 PM)
-    free_evenings = []
-    for d in week_days:
-        eve_evs = [
-            e for e in week_evs
-            if _ev_date(e) == d and not _is_allday(e) and (
-                (dt := _dt(e)) and dt.hour >= 17 and dt.hour < 21
-            )
-        ]
-        if not eve_evs:
-            free_evenings.append(d)
+    # any() stops at the first evening hit instead of collecting them all
+    free_evenings = [
+        d for d in week_days
+        if not any(
+            not _is_allday(e) and (dt := _dt(e)) and 17 <= dt.hour < 21
+            for e in by_day.get(d, ())
+        )
+    ]
     free_ev_labels = [d.strftime("%a") for d in free_evenings[:3]]
 
     # pending drafts
     drafts = st.session_state.get("pending_events") or []
     ndrafts = len(drafts)
 
-    # conflict detection
-    def _conflicts(evs):
+    # conflict detection — the week's timed events as parallel lists sorted by
+    # start (events / starts / ends), shared by the weekly scan and the
+    # per-draft overlap check below.
+    _timed = sorted(((st_, e) for e in week_evs if (st_ := _dt(e))), key=lambda x: x[0])
+    t_evs    = [e for _, e in _timed]
+    t_starts = [st_ for st_, _ in _timed]
+    t_ends   = [_end_dt(e) for e in t_evs]
+
+    def _conflicts():
         """Return list of (ev_a, ev_b) pairs that overlap."""
         pairs = []
-        timed = [(e, _dt(e), _end_dt(e)) for e in evs if _dt(e)]
-        timed.sort(key=lambda x: x[1])
-        for i in range(len(timed)):
-            for j in range(i + 1, len(timed)):
-                a_start, a_end = timed[i][1], timed[i][2]
-                b_start, b_end = timed[j][1], timed[j][2]
-                if a_end and b_start and a_end > b_start:
-                    pairs.append((timed[i][0], timed[j][0]))
+        for i, a_end in enumerate(t_ends):
+            if not a_end:
+                continue
+            # Sorted by start: only events starting before a_end can overlap it.
+            for j in range(i + 1, bisect_left(t_starts, a_end, i + 1)):
+                pairs.append((t_evs[i], t_evs[j]))
         return pairs
 
-    all_conflicts = _conflicts(week_evs)
+    def _overlapping(d_start, d_end):
+        """Week events overlapping [d_start, d_end), in start order."""
+        hi = bisect_left(t_starts, d_end)
+        return [t_evs[j] for j in range(hi) if t_ends[j] and t_ends[j] > d_start]
+
+    all_conflicts = _conflicts()
 
     # ── CSS ───────────────────────────────────────────────────
     st.markdown("""
@@ -1305,7 +1338,7 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
         is_today = (d == today)
         hdr_cls  = "cal-day-hdr today" if is_today else "cal-day-hdr"
         day_evs  = sorted(
-            [e for e in week_evs if _ev_date(e) == d],
+            by_day.get(d, ()),
             key=lambda e: str(e.get("start_raw") or "")
         )
         with col:
@@ -1336,9 +1369,9 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
 
         # Build a contextual observation from free slots
         now_dt = datetime.now().astimezone()
-        free_today = today not in day_counts
+        free_today = today not in by_day
         tomorrow   = today + timedelta(days=1)
-        free_tmrw  = tomorrow not in day_counts
+        free_tmrw  = tomorrow not in by_day
 
         if free_today:
             obs = "You have a clear day today — great time to tackle something from your Ideas Inbox or plan ahead."
@@ -1392,20 +1425,21 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
             )
             st.markdown(f"**Today's Schedule — {today.strftime('%A, %b %d')}**")
             if today_evs:
+                chips = ""
                 for ev in today_evs:
                     t = _hm(ev)
                     te = _hm_end(ev)
                     title = ev.get("title", "Event")
                     loc   = ev.get("location", "")
                     clr = color_map.get(title, "blue")
-                    chip_html = (
+                    chips += (
                         f'<div class="cal-chip {clr}" style="margin-bottom:5px;">'
                         f'<span style="font-size:.7rem;opacity:.8;">{t} – {te}</span><br>'
                         f'<b>{title}</b>'
                         f'{(" · 📍 " + loc) if loc else ""}'
                         f'</div>'
                     )
-                    st.markdown(chip_html, unsafe_allow_html=True)
+                st.markdown(chips, unsafe_allow_html=True)
             else:
                 st.markdown('<div class="cal-chip free" style="margin-bottom:5px;">Nothing scheduled — enjoy the freedom!</div>', unsafe_allow_html=True)
             if st.button("✖ Close", key="cal_close_today", use_container_width=True):
@@ -1415,19 +1449,24 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
         elif filter_mode == "free":
             st.markdown("**Free Slots This Week**")
             if free_evenings:
-                for d in free_evenings:
-                    st.markdown(
+                st.markdown(
+                    "".join(
                         f'<div class="cal-chip free" style="margin-bottom:5px;">'
-                        f'{d.strftime("%A, %b %d")} — Free Evening</div>',
-                        unsafe_allow_html=True,
-                    )
+                        f'{d.strftime("%A, %b %d")} — Free Evening</div>'
+                        for d in free_evenings
+                    ),
+                    unsafe_allow_html=True,
+                )
             else:
                 st.markdown("No fully free evenings this week.")
-            free_days_week = [d for d in week_days if d not in day_counts]
-            for d in free_days_week:
+            free_days_week = [d for d in week_days if d not in by_day]
+            if free_days_week:
                 st.markdown(
-                    f'<div class="cal-chip green" style="margin-bottom:5px;">'
-                    f'{d.strftime("%A, %b %d")} — Completely Free</div>',
+                    "".join(
+                        f'<div class="cal-chip green" style="margin-bottom:5px;">'
+                        f'{d.strftime("%A, %b %d")} — Completely Free</div>'
+                        for d in free_days_week
+                    ),
                     unsafe_allow_html=True,
                 )
             if st.button("✖ Close", key="cal_close_free", use_container_width=True):
@@ -1470,11 +1509,7 @@ def _render_calendar(calendar_events=None, pending_missions=0, location="", user
                 try:
                     d_start = datetime.fromisoformat(start).astimezone()
                     d_end   = datetime.fromisoformat(end_time).astimezone() if end_time else d_start + timedelta(hours=1)
-                    for ev in week_evs:
-                        e_start = _dt(ev)
-                        e_end   = _end_dt(ev)
-                        if e_start and e_end and e_end > d_start and e_start < d_end:
-                            draft_conflicts.append(ev)
+                    draft_conflicts = _overlapping(d_start, d_end)
                 except Exception:
                     pass
 
@@ -1759,9 +1794,9 @@ def _render_memory(memory_rows=None, user_email="", **_):
                 return "chip-idea"
             return "chip-pref" if entry.get("kind") == "preference" else "chip-pattern"
 
-        clusters: dict = {}
+        clusters = defaultdict(list)
         for entry in prefs:
-            clusters.setdefault(_cluster(entry), []).append(entry)
+            clusters[_cluster(entry)].append(entry)
         if active_ideas:
             clusters["Quick Ideas"] = [
                 {"kind": "idea",
@@ -2188,6 +2223,11 @@ def _render_settings(user_email="", user_name="", **_):
                     supabase_upsert_token(st, user_id=email, token_json=None, provider="google_calendar")
                 except Exception:
                     pass
+                try:
+                    from src.flow import clear_calendar_cache
+                    clear_calendar_cache()
+                except Exception:
+                    pass
                 st.session_state["calendar_online"] = False
                 st.session_state["calendar_events"] = None
                 st.rerun()
@@ -6,15 +6,28 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from typing import Any, Dict, List
 
+try:
+    from orjson import OPT_NON_STR_KEYS as _ORJSON_OPTS
+    from orjson import dumps as _orjson_dumps
+except ImportError:
+    _orjson_dumps = None
+
 
 # ---------------------------
 # Helpers
 # ---------------------------
 def _to_json(obj: Any) -> str:
+    if _orjson_dumps is not None:
+        # Same compact, non-ASCII-escaped text as the stdlib call below.
+        try:
+            return _orjson_dumps(obj, option=_ORJSON_OPTS).decode()
+        except TypeError:
+            pass
     try:
-        return json.dumps(obj, ensure_ascii=False)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
     except Exception:
         return "[]"
 
@@ -41,6 +54,11 @@ def _schema_question_example() -> Dict[str, Any]:
     return {"type": "question", "text": "string", "pre_prep": "string", "events": []}
 
 
+# The schemas never change — serialise them once for every prompt that embeds them.
+_SCHEMA_JSON = _to_json(_schema_example())
+_SCHEMA_QUESTION_JSON = _to_json(_schema_question_example())
+
+
 _FINAL_REPLY_LINE = "Reply exactly: schedule A / schedule B / schedule C"
 
 
@@ -69,71 +87,41 @@ def _safe_lines_from_ideas(items: List[Dict[str, Any]]) -> str:
     return "\n".join(lines) if lines else "- (none)"
 
 
-# ---------------------------
-# Main system prompt
-# ---------------------------
-def build_system_prompt(ctx: Dict[str, Any]) -> str:
-    """
-    Checkpoint 2.8 – Full context utilisation.
-    All user data (memory, preferences, feedback, ideas, calendar, missions)
-    is surfaced in distinct readable blocks the AI uses directly.
-    """
-
-    current_time_str = str(ctx.get("current_time_str", "") or "")
-    cheat_sheet = str(ctx.get("cheat_sheet", "") or "")
-    next_saturday = str(ctx.get("next_saturday", "") or "")
-    current_location = str(ctx.get("current_location", "") or "")
-    calendar_data = ctx.get("calendar_data", [])
-    pending_dump = ctx.get("pending_dump", "[]")
-    memory_dump = str(ctx.get("memory_dump", "[]") or "[]")
-    history_txt = str(ctx.get("history_txt", "") or "")
-    idea_options = ctx.get("idea_options", []) or []
-    selected_idea = str(ctx.get("selected_idea") or "")
-    continuation_hint = str(ctx.get("continuation_hint") or "")
-    user_request = str(ctx.get("user_request", "") or "")
-
-    memory_summary = ctx.get("memory_summary") or []
-    ideas_summary  = ctx.get("ideas_summary")  or []
-    feedback_raw   = str(ctx.get("feedback_dump", "[]") or "[]")
-
-    # ── HOUSEHOLD PROFILE: human-readable preference lines ────────────────────
-    memory_block = _safe_lines_from_kv(memory_summary) if memory_summary else "- (no preferences recorded yet)"
-
-    # ── IDEAS INBOX: pending activities as a clean list ───────────────────────
-    ideas_block = _safe_lines_from_ideas(ideas_summary) if ideas_summary else "- (no ideas yet)"
-
-    # ── FEEDBACK: parse into plain completed / skipped summaries ─────────────
-    def _build_feedback_block(raw: str) -> str:
-        try:
-            entries = json.loads(raw or "[]")
-            if not isinstance(entries, list) or not entries:
-                return "- No feedback recorded yet."
-            completed, skipped = [], []
-            for e in entries[:30]:
-                m    = (e.get("mission") or "").strip()
-                r    = (e.get("rating") or "").lower()
-                t    = (e.get("feedback_type") or "").lower()
-                note = (e.get("reason") or e.get("note") or e.get("feedback") or "").strip()
-                if not m:
-                    continue
-                if t == "completed" or r == "thumbs_up":
-                    completed.append(m)
-                elif t in ("skipped", "skip") or r == "thumbs_down":
-                    skipped.append(f"{m}" + (f" — {note}" if note else ""))
-            lines = []
-            if completed:
-                lines.append("Completed: " + "; ".join(dict.fromkeys(completed))[:300])
-            if skipped:
-                lines.append("Skipped/avoided: " + "; ".join(dict.fromkeys(skipped))[:300])
-            return "\n".join(lines) if lines else "- No feedback recorded yet."
-        except Exception:
+def _build_feedback_block(raw: str) -> str:
+    """Parse the feedback dump into plain completed / skipped summaries."""
+    try:
+        entries = json.loads(raw or "[]")
+        if not isinstance(entries, list) or not entries:
             return "- No feedback recorded yet."
+        completed, skipped = [], []
+        for e in entries[:30]:
+            m    = (e.get("mission") or "").strip()
+            r    = (e.get("rating") or "").lower()
+            t    = (e.get("feedback_type") or "").lower()
+            note = (e.get("reason") or e.get("note") or e.get("feedback") or "").strip()
+            if not m:
+                continue
+            if t == "completed" or r == "thumbs_up":
+                completed.append(m)
+            elif t in ("skipped", "skip") or r == "thumbs_down":
+                skipped.append(f"{m}" + (f" — {note}" if note else ""))
+        lines = []
+        if completed:
+            lines.append("Completed: " + "; ".join(dict.fromkeys(completed))[:300])
+        if skipped:
+            lines.append("Skipped/avoided: " + "; ".join(dict.fromkeys(skipped))[:300])
+        return "\n".join(lines) if lines else "- No feedback recorded yet."
+    except Exception:
+        return "- No feedback recorded yet."
 
-    feedback_block = _build_feedback_block(feedback_raw)
 
-    schema = _schema_example()
+# The rules block only changes when memory, ideas or feedback do, so
+# back-to-back turns reuse it; the per-turn tail is appended in build_system_prompt.
+@lru_cache(maxsize=8)
+def _rules_block(memory_block: str, ideas_block: str, feedback_raw: str) -> str:
+    feedback_block = _build_feedback_block(feedback_raw)
 
-    rules_block = f"""
+    return f"""
 YOU ARE: Family COO — personal chief-of-staff for the Khandare household in Tampa, FL.
 Make every response immediately actionable and deeply personalised to this family.
 
@@ -284,6 +272,42 @@ QUICK ACTION tags:
 - mission_review → Top 2 active missions. (A) tackle NOW with specific steps, (B) 2nd priority.""".strip()
 
 
+# ---------------------------
+# Main system prompt
+# ---------------------------
+def build_system_prompt(ctx: Dict[str, Any]) -> str:
+    """
+    Checkpoint 2.8 – Full context utilisation.
+    All user data (memory, preferences, feedback, ideas, calendar, missions)
+    is surfaced in distinct readable blocks the AI uses directly.
+    """
+
+    current_time_str = str(ctx.get("current_time_str", "") or "")
+    cheat_sheet = str(ctx.get("cheat_sheet", "") or "")
+    next_saturday = str(ctx.get("next_saturday", "") or "")
+    current_location = str(ctx.get("current_location", "") or "")
+    calendar_data = ctx.get("calendar_data", [])
+    pending_dump = ctx.get("pending_dump", "[]")
+    memory_dump = str(ctx.get("memory_dump", "[]") or "[]")
+    history_txt = str(ctx.get("history_txt", "") or "")
+    idea_options = ctx.get("idea_options", []) or []
+    selected_idea = str(ctx.get("selected_idea") or "")
+    continuation_hint = str(ctx.get("continuation_hint") or "")
+    user_request = str(ctx.get("user_request", "") or "")
+
+    memory_summary = ctx.get("memory_summary") or []
+    ideas_summary  = ctx.get("ideas_summary")  or []
+    feedback_raw   = str(ctx.get("feedback_dump", "[]") or "[]")
+
+    # ── HOUSEHOLD PROFILE: human-readable preference lines ────────────────────
+    memory_block = _safe_lines_from_kv(memory_summary) if memory_summary else "- (no preferences recorded yet)"
+
+    # ── IDEAS INBOX: pending activities as a clean list ───────────────────────
+    ideas_block = _safe_lines_from_ideas(ideas_summary) if ideas_summary else "- (no ideas yet)"
+
+    rules_block = _rules_block(memory_block, ideas_block, feedback_raw)
+
+
     lines: List[str] = [rules_block]
 
     if current_time_str:
@@ -324,7 +348,7 @@ QUICK ACTION tags:
         lines += ["", "CONTINUATION HINT:", continuation_hint.strip()]
 
     lines += ["", "TASK:", f'Turn the user request into an actionable outcome: "{user_request}"']
-    lines += ["", "OUTPUT JSON SCHEMA EXAMPLE (match keys + structure):", _to_json(schema)]
+    lines += ["", "OUTPUT JSON SCHEMA EXAMPLE (match keys + structure):", _SCHEMA_JSON]
 
     return "\n".join(lines).strip()
 
@@ -333,13 +357,12 @@ QUICK ACTION tags:
 # JSON repair prompt
 # ---------------------------
 def build_json_repair_prompt(bad_text: str) -> str:
-    schema = _schema_example()
     lines: List[str] = []
     lines.append("You must output STRICT JSON ONLY. No markdown. No explanations.")
     lines.append("Top-level keys MUST be exactly: type, text, pre_prep, events (no extras).")
     lines.append("")
     lines.append("Fix the following into a valid JSON object that matches EXACTLY this schema and includes ALL fields:")
-    lines.append(_to_json(schema))
+    lines.append(_SCHEMA_JSON)
     lines.append("")
     lines.append('If info is missing, use type="question", events=[], and use the A/B/C TEMPLATE (multi-line) to ask for day/date + start time + place together.')
     lines.append("")
@@ -351,6 +374,56 @@ def build_json_repair_prompt(bad_text: str) -> str:
 # ---------------------------
 # Weekend forced regeneration prompt (kept stable)
 # ---------------------------
+# Everything in the weekend regen prompt that doesn't depend on ctx, joined once.
+_WEEKEND_REGEN_HEAD = "\n".join([
+    "Return STRICT JSON ONLY. No markdown. No extra text.",
+    "Top-level keys MUST be exactly: type, text, pre_prep, events (no extras).",
+    "",
+    "You MUST return a JSON object matching this schema exactly (include ALL fields):",
+    _SCHEMA_QUESTION_JSON,
+])
+_WEEKEND_REGEN_RULES = "\n".join([
+    "Use missions + feedback + ideas to pick activities this specific family would enjoy.",
+    "Rotate activity types: vary indoor/outdoor, active/relaxed, morning/afternoon/evening.",
+    "",
+    "MANDATORY RULES:",
+    '- type MUST be "question"',
+    "- events MUST be []",
+    "- text MUST be plain text (NO markdown) and MUST follow EXACTLY the template below.",
+    "- pre_prep MUST contain exactly 1 helpful tip sentence.",
+    "- pre_prep MUST ALSO include one line starting with OPTIONS_JSON= followed by a JSON list of 3 objects.",
+    "- OPTIONS_JSON objects MUST match the text options A/B/C and include keys: key,title,duration_hours,time_window,notes",
+    "",
+    "TEXT TEMPLATE (copy structure exactly):",
+    "Weekend outing — pick one:",
+    "",
+    "(A) <Title>",
+    "    When: <Day/Date> • <Start Time> – <End Time>",
+    "    Where: <Place>",
+    "    Notes: <1 short detail>",
+    "",
+    "(B) <Title>",
+    "    When: <Day/Date> • <Start Time> – <End Time>",
+    "    Where: <Place>",
+    "    Notes: <1 short detail>",
+    "",
+    "(C) <Title>",
+    "    When: <Day/Date> • <Start Time> – <End Time>",
+    "    Where: <Place>",
+    "    Notes: <1 short detail>",
+    "",
+    _FINAL_REPLY_LINE,
+    "(Optional: add Sat/Sun + adjust time window)",
+    "",
+    "pre_prep FORMAT (must include both):",
+    "1) Tip: <one sentence>",
+    '2) OPTIONS_JSON=[{"key":"A","title":"...","duration_hours":2,"time_window":"Sat 10:00 AM–12:00 PM","notes":"..."}, {"key":"B","title":"...","duration_hours":3,"time_window":"Sun 1:00 PM–4:00 PM","notes":"..."}, {"key":"C","title":"...","duration_hours":2,"time_window":"Sat 4:00 PM–6:00 PM","notes":"..."}]',
+    "",
+    "If user expressed a stable preference, append ONE memory tag at the end of pre_prep on a new line:",
+    '[[MEMORY:{"kind":"preference","key":"...","value":"...","confidence":0.0-1.0,"notes":""}]]',
+])
+
+
 def build_weekend_regen_prompt(ctx: Dict[str, Any]) -> str:
     user_request = str(ctx.get("user_request", "") or "")
     current_location = str(ctx.get("current_location", "") or "")
@@ -361,64 +434,21 @@ def build_weekend_regen_prompt(ctx: Dict[str, Any]) -> str:
     avoid_ideas = ctx.get("avoid_ideas") or []
     constraints = ctx.get("constraints", {}) or {}
 
-    schema_question = _schema_question_example()
-
     lines: List[str] = []
-    lines.append("Return STRICT JSON ONLY. No markdown. No extra text.")
-    lines.append("Top-level keys MUST be exactly: type, text, pre_prep, events (no extras).")
-    lines.append("")
-    lines.append("You MUST return a JSON object matching this schema exactly (include ALL fields):")
-    lines.append(_to_json(schema_question))
+    lines.append(_WEEKEND_REGEN_HEAD)
     lines.append("")
     lines.append(f"User location: {current_location}")
     lines.append(f"Memory bank: {memory_dump}")
     lines.append(f"Past missions (use to personalise — what has this family done?): {missions_dump}")
     lines.append(f"Feedback & learnings (avoid repeating disliked things): {feedback_dump}")
     lines.append(f"Ideas Inbox (prioritise these when relevant): {ideas_dump}")
-    lines.append(f"Constraints (MUST honor): {json.dumps(constraints, ensure_ascii=False)}")
+    lines.append(f"Constraints (MUST honor): {_to_json(constraints)}")
     if avoid_ideas:
         avoid_str = ", ".join(f'"{t}"' for t in avoid_ideas[:8])
         lines.append(f"ALREADY SHOWN — DO NOT REPEAT: {avoid_str}")
         lines.append("You MUST suggest completely different activities, venues, and time slots.")
     lines.append("")
     lines.append(f'Task: Generate EXACTLY 3 FRESH, PERSONALISED family-friendly weekend outing options for: "{user_request}"')
-    lines.append("Use missions + feedback + ideas to pick activities this specific family would enjoy.")
-    lines.append("Rotate activity types: vary indoor/outdoor, active/relaxed, morning/afternoon/evening.")
-    lines.append("")
-    lines.append("MANDATORY RULES:")
-    lines.append('- type MUST be "question"')
-    lines.append("- events MUST be []")
-    lines.append("- text MUST be plain text (NO markdown) and MUST follow EXACTLY the template below.")
-    lines.append("- pre_prep MUST contain exactly 1 helpful tip sentence.")
-    lines.append("- pre_prep MUST ALSO include one line starting with OPTIONS_JSON= followed by a JSON list of 3 objects.")
-    lines.append("- OPTIONS_JSON objects MUST match the text options A/B/C and include keys: key,title,duration_hours,time_window,notes")
-    lines.append("")
-    lines.append("TEXT TEMPLATE (copy structure exactly):")
-    lines.append("Weekend outing — pick one:")
-    lines.append("")
-    lines.append("(A) <Title>")
-    lines.append("    When: <Day/Date> • <Start Time> – <End Time>")
-    lines.append("    Where: <Place>")
-    lines.append("    Notes: <1 short detail>")
-    lines.append("")
-    lines.append("(B) <Title>")
-    lines.append("    When: <Day/Date> • <Start Time> – <End Time>")
-    lines.append("    Where: <Place>")
-    lines.append("    Notes: <1 short detail>")
-    lines.append("")
-    lines.append("(C) <Title>")
-    lines.append("    When: <Day/Date> • <Start Time> – <End Time>")
-    lines.append("    Where: <Place>")
-    lines.append("    Notes: <1 short detail>")
-    lines.append("")
-    lines.append(_FINAL_REPLY_LINE)
-    lines.append("(Optional: add Sat/Sun + adjust time window)")
-    lines.append("")
-    lines.append("pre_prep FORMAT (must include both):")
-    lines.append("1) Tip: <one sentence>")
-    lines.append('2) OPTIONS_JSON=[{"key":"A","title":"...","duration_hours":2,"time_window":"Sat 10:00 AM–12:00 PM","notes":"..."}, {"key":"B","title":"...","duration_hours":3,"time_window":"Sun 1:00 PM–4:00 PM","notes":"..."}, {"key":"C","title":"...","duration_hours":2,"time_window":"Sat 4:00 PM–6:00 PM","notes":"..."}]')
-    lines.append("")
-    lines.append("If user expressed a stable preference, append ONE memory tag at the end of pre_prep on a new line:")
-    lines.append('[[MEMORY:{"kind":"preference","key":"...","value":"...","confidence":0.0-1.0,"notes":""}]]')
+    lines.append(_WEEKEND_REGEN_RULES)
 
     return "\n".join(lines).strip()
\ No newline at end of file
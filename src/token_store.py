@@ -4,23 +4,35 @@ import urllib.parse
 import urllib.request
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 
 # ------------------------------------------------------------
 # Supabase REST config
 # ------------------------------------------------------------
+# Resolved once per process: every token/session REST call needs it, and each
+# st.secrets access walks the parsed TOML. Only a missing config is retried on
+# the next call (lru_cache never stores the raise); once found, the values are
+# kept until restart.
+@lru_cache(maxsize=1)
+def _supabase_cfg_values(st) -> tuple:
+    sb = st.secrets.get("supabase", {})
+    url = (sb.get("url") or "").rstrip("/")
+    # For auth endpoints we must use anon_key.
+    # For REST table reads/writes, service_role_key works too (but keep least-privileged if possible).
+    anon_key = sb.get("anon_key") or ""
+    service_key = sb.get("service_role_key") or anon_key
+    if not url or not (anon_key or service_key):
+        raise KeyError("supabase")
+    return url, anon_key, service_key
+
+
 def _supabase_cfg(st):
+    # A fresh dict per call, so a caller can't alter the config for every session.
     try:
-        sb = st.secrets.get("supabase", {})
-        url = (sb.get("url") or "").rstrip("/")
-        # For auth endpoints we must use anon_key.
-        # For REST table reads/writes, service_role_key works too (but keep least-privileged if possible).
-        anon_key = sb.get("anon_key") or ""
-        service_key = sb.get("service_role_key") or anon_key
-        if not url or not (anon_key or service_key):
-            return None
-        return {"url": url, "anon_key": anon_key, "service_key": service_key}
+        url, anon_key, service_key = _supabase_cfg_values(st)
     except Exception:
         return None
+    return {"url": url, "anon_key": anon_key, "service_key": service_key}
 
 
 # ------------------------------------------------------------
@@ -1,17 +1,16 @@
+import re
 import streamlit as st
-import urllib.parse
 from datetime import datetime
+from functools import lru_cache
 
 
 
 # ------------------------------------------------------------
 # CSS
 # ------------------------------------------------------------
-def inject_css():
-    import streamlit as st
-
-    st.markdown(
-        """
+# Static stylesheet + one-shot TZ detection script (~30 KB). Lives at module
+# scope so inject_css() only ships a prebuilt constant on each rerun.
+_CSS = """
         <style>
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap');
 
@@ -623,10 +622,15 @@ def inject_css():
                 window.location.replace(u.toString());
             } catch(e) {}
         })();
-        </script>""",
-        unsafe_allow_html=True,
-    )
-    
+        </script>"""
+
+
+def inject_css():
+    # Streamlit removes any element that is not re-emitted on a rerun, so the
+    # <style> block still has to be sent every time; only the build is hoisted.
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+
 # ------------------------------------------------------------
 # SIDEBAR
 # ------------------------------------------------------------
@@ -844,6 +848,18 @@ def render_metrics(
         unsafe_allow_html=True,
     )
 
+def _dispatch_choice(key, actions):
+    """
+    on_change for a segmented_control used as a button group: run the picked
+    action, then clear the selection so the same option can be picked again.
+    """
+    choice = st.session_state.get(key)
+    st.session_state[key] = None
+    fn = actions.get(choice)
+    if callable(fn):
+        fn()
+
+
 def render_checkin_smart_strip():
     """
     Renders the Check-in Required strip + inline buttons (Yes/No/Snooze),
@@ -912,14 +928,19 @@ def render_checkin_smart_strip():
         st.markdown('<div class="coo-checkin-actions">', unsafe_allow_html=True)
 
         if mode == "ask":
-            b1, b2, b3 = st.columns(3, gap="small")
-            with b1:
-                st.button("✅ Yes", use_container_width=True, on_click=checkin_yes, key="chk_yes")
-            with b2:
-                st.button("❌ No", use_container_width=True, on_click=checkin_no, key="chk_no")
-            with b3:
-                # default snooze 4h; adjust if you want 2h/6h etc.
-                st.button("⏰ Snooze", use_container_width=True, on_click=checkin_snooze, kwargs={"hours": 4}, key="chk_snooze")
+            # default snooze 4h; adjust if you want 2h/6h etc.
+            st.segmented_control(
+                "Check-in",
+                ["✅ Yes", "❌ No", "⏰ Snooze"],
+                key="chk_choice",
+                label_visibility="collapsed",
+                on_change=_dispatch_choice,
+                args=("chk_choice", {
+                    "✅ Yes": checkin_yes,
+                    "❌ No": checkin_no,
+                    "⏰ Snooze": lambda: checkin_snooze(hours=4),
+                }),
+            )
 
         else:
             # action mode (user clicked No)
@@ -958,31 +979,30 @@ def render_command_center(
     checkin_item=None,
     on_checkin_yes=None,
     on_checkin_no_with_feedback=None,
+    on_brain_save=None,
 ):
     import streamlit as st
 
-    # --- Safe init ---
-    st.session_state.setdefault("checkin_feedback_open", False)
-    st.session_state.setdefault("checkin_feedback_text", "")
-
-    # ✅ Deferred clear flags (check-in feedback)
-    st.session_state.setdefault("clear_checkin_feedback_text", False)
+    # --- Safe init (built per call: fresh [] / {} for each session) ---
+    defaults = {
+        "checkin_feedback_open": False,
+        "checkin_feedback_text": "",
+        # ✅ Deferred clear flags
+        "clear_checkin_feedback_text": False,
+        "clear_plan_text": False,
+        "clear_conversation": False,
+        # Keys used by flow.py init_state()
+        "plan_text": "",
+        "chat_history": [],
+    }
+    for k, v in defaults.items():
+        st.session_state.setdefault(k, v)
 
     # ✅ Clear BEFORE widget instantiation (mandatory rule)
     if st.session_state.get("clear_checkin_feedback_text"):
         st.session_state["checkin_feedback_text"] = ""
         st.session_state["clear_checkin_feedback_text"] = False
 
-    # ✅ Deferred clear flags
-    st.session_state.setdefault("clear_plan_text", False)
-    st.session_state.setdefault("clear_conversation", False)
-
-    # Keys used by flow.py init_state()
-    st.session_state.setdefault("plan_text", "")
-    st.session_state.setdefault("chat_history", [])
-    st.session_state.setdefault("last_result_type", None)
-    st.session_state.setdefault("last_result_text", "")
-
     # ✅ Clear BEFORE widget instantiation (mandatory rule)
     if st.session_state.get("clear_plan_text"):
         st.session_state["plan_text"] = ""
@@ -991,8 +1011,6 @@ def render_command_center(
     # ✅ Clear conversation BEFORE rendering chat UI
     if st.session_state.get("clear_conversation"):
         st.session_state["chat_history"] = []
-        st.session_state["last_result_type"] = None
-        st.session_state["last_result_text"] = ""
         st.session_state["clear_conversation"] = False
 
     with st.container():
@@ -1003,7 +1021,7 @@ def render_command_center(
             title = (checkin_item.get("title") or "this item").strip()
             prompt = f'Did you complete "{title}"?'
 
-            left, yes_col, no_col = st.columns([7, 1.3, 1.3], gap="small")
+            left, choice_col = st.columns([7, 2.6], gap="small")
 
             with left:
                 st.markdown(
@@ -1019,19 +1037,25 @@ def render_command_center(
                     unsafe_allow_html=True,
                 )
 
-            with yes_col:
-                if st.button("Yes", key="coo_checkin_yes", type="primary", use_container_width=True):
-                    with st.spinner("✅ Marking complete…"):
-                        if callable(on_checkin_yes):
-                            on_checkin_yes()
-                    st.session_state["checkin_feedback_open"] = False
-                    st.session_state["clear_checkin_feedback_text"] = True
-                    st.rerun()
-
-            with no_col:
-                if st.button("No", key="coo_checkin_no", use_container_width=True):
-                    st.session_state["checkin_feedback_open"] = True
-                    st.rerun()
+            def _checkin_yes():
+                if callable(on_checkin_yes):
+                    on_checkin_yes()
+                st.session_state["checkin_feedback_open"] = False
+                st.session_state["clear_checkin_feedback_text"] = True
+
+            def _checkin_no():
+                st.session_state["checkin_feedback_open"] = True
+
+            # One segmented control instead of a column pair + two buttons.
+            with choice_col:
+                st.segmented_control(
+                    "Check-in",
+                    ["Yes", "No"],
+                    key="coo_checkin_choice",
+                    label_visibility="collapsed",
+                    on_change=_dispatch_choice,
+                    args=("coo_checkin_choice", {"Yes": _checkin_yes, "No": _checkin_no}),
+                )
 
             if st.session_state.get("checkin_feedback_open"):
                 st.markdown('<div class="coo-checkin-feedback">', unsafe_allow_html=True)
@@ -1039,38 +1063,34 @@ def render_command_center(
                     '<div class="coo-checkin-feedback-title">Quick feedback (1 line)</div>',
                     unsafe_allow_html=True,
                 )
-                st.text_input(
-                    label="",
-                    key="checkin_feedback_text",
-                    placeholder="e.g., got busy",
-                    label_visibility="collapsed",
-                )
-                f1, f2 = st.columns([1, 1], gap="small")
-                with f1:
-                    if st.button("Save", key="coo_checkin_save", use_container_width=True):
-                        txt = (st.session_state.get("checkin_feedback_text") or "").strip()
-                        if callable(on_checkin_no_with_feedback):
-                            on_checkin_no_with_feedback(txt)
-                        st.session_state["checkin_feedback_open"] = False
-                        st.session_state["clear_checkin_feedback_text"] = True
-                        st.rerun()
-                with f2:
-                    if st.button("Cancel", key="coo_checkin_cancel", use_container_width=True):
-                        st.session_state["checkin_feedback_open"] = False
-                        st.session_state["clear_checkin_feedback_text"] = True
-                        st.rerun()
+                # A form: typing (and Enter) doesn't rerun the page; only
+                # Save / Cancel submit, in a single rerun.
+                with st.form("coo_checkin_feedback_form", border=False):
+                    st.text_input(
+                        label="",
+                        key="checkin_feedback_text",
+                        placeholder="e.g., got busy",
+                        label_visibility="collapsed",
+                    )
+                    f1, f2 = st.columns([1, 1], gap="small")
+                    with f1:
+                        save = st.form_submit_button("Save", use_container_width=True)
+                    with f2:
+                        cancel = st.form_submit_button("Cancel", use_container_width=True)
+                if save:
+                    txt = (st.session_state.get("checkin_feedback_text") or "").strip()
+                    if callable(on_checkin_no_with_feedback):
+                        on_checkin_no_with_feedback(txt)
+                if save or cancel:
+                    st.session_state["checkin_feedback_open"] = False
+                    st.session_state["clear_checkin_feedback_text"] = True
+                    st.rerun()
                 st.markdown("</div>", unsafe_allow_html=True)
 
         # ===== Input =====
         st.markdown("<div class='coo-hero-title'>📝 Plan your day</div>", unsafe_allow_html=True)
 
-        st.text_area(
-            "Command",
-            key="plan_text",
-            placeholder="e.g. 'Plan a movie night this Saturday at 7 PM...'",
-            height=140,
-            label_visibility="collapsed",
-        )
+        _render_plan_input()
 
         st.markdown('<div class="coo-action-row">', unsafe_allow_html=True)
         t1, t2, t3 = st.columns([1, 1, 1.4], gap="small")
@@ -1110,39 +1130,7 @@ def render_command_center(
 
         # Camera widget — shown when Scan toggled on
         if st.session_state.get("show_camera"):
-            st.markdown(
-                """
-                <div style='
-                    background:#eff6ff;
-                    border:1.5px solid #bfdbfe;
-                    border-left:4px solid #3b82f6;
-                    border-radius:12px;
-                    padding:12px 14px;
-                    margin:12px 0 8px;
-                '>
-                  <div style='font-weight:900;color:#1e40af;font-size:14px;margin-bottom:4px;'>
-                    📷 Camera Scan
-                  </div>
-                  <div style='font-size:13px;color:#3b82f6;font-weight:600;line-height:1.5;'>
-                    1 · Allow camera access if prompted<br>
-                    2 · Point at the text you want to scan<br>
-                    3 · Click <b>Take photo</b> below the viewfinder<br>
-                    4 · Hit <b>🚀 Execute</b> to process the image
-                  </div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-
-            cam_img = st.camera_input(
-                "📷 Point at text then click Take photo",
-                key="cam_input",
-            )
-
-            if cam_img:
-                st.success("✅ Photo captured! Click **🚀 Execute** to process it.")
-                # Show thumbnail so user can confirm what was captured
-                st.image(cam_img, caption="Captured — ready to process", use_container_width=True)
+            _render_camera_panel()
 
         # ===== Conversation =====
         st.markdown("<div class='coo-hero-divider'></div>", unsafe_allow_html=True)
@@ -1199,51 +1187,101 @@ def render_command_center(
                             st.rerun()
 
         # ===== Train the Brain =====
-        st.markdown("<div class='coo-hero-divider'></div>", unsafe_allow_html=True)
-        st.markdown('<div class="coo-train-row">', unsafe_allow_html=True)
-        fL, fM, fR = st.columns([1.2, 3.6, 1.0], gap="small")
-        with fL:
-            st.markdown("<div class='coo-footer-label'>💡 Train the Brain:</div>", unsafe_allow_html=True)
-            st.checkbox("Bad Response?", key="brain_bad_response")
-        with fM:
-            st.text_input(
-                "Input",
-                key="brain_correction",
-                placeholder="Correction (e.g. 'Gym is closed Sundays')",
-                label_visibility="collapsed",
-            )
-        with fR:
-            if st.button("Save", use_container_width=True, key="brain_save"):
-                st.toast("Saved.")
-        st.markdown('</div>', unsafe_allow_html=True)
+        _render_train_brain(on_save=on_brain_save)
+
+
+@st.fragment
+def _render_plan_input():
+    # Committing the text area (blur / Ctrl+Enter) only reruns this fragment;
+    # Execute reads the value back from st.session_state["plan_text"].
+    st.text_area(
+        "Command",
+        key="plan_text",
+        placeholder="e.g. 'Plan a movie night this Saturday at 7 PM...'",
+        height=140,
+        label_visibility="collapsed",
+    )
+
+
+@st.fragment
+def _render_camera_panel():
+    # Taking / retaking a photo only reruns this panel, not the whole page.
+    st.markdown(
+        """
+        <div style='
+            background:#eff6ff;
+            border:1.5px solid #bfdbfe;
+            border-left:4px solid #3b82f6;
+            border-radius:12px;
+            padding:12px 14px;
+            margin:12px 0 8px;
+        '>
+          <div style='font-weight:900;color:#1e40af;font-size:14px;margin-bottom:4px;'>
+            📷 Camera Scan
+          </div>
+          <div style='font-size:13px;color:#3b82f6;font-weight:600;line-height:1.5;'>
+            1 · Allow camera access if prompted<br>
+            2 · Point at the text you want to scan<br>
+            3 · Click <b>Take photo</b> below the viewfinder<br>
+            4 · Hit <b>🚀 Execute</b> to process the image
+          </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    cam_img = st.camera_input(
+        "📷 Point at text then click Take photo",
+        key="cam_input",
+    )
+
+    if cam_img:
+        st.success("✅ Photo captured! Click **🚀 Execute** to process it.")
+        # Show thumbnail so user can confirm what was captured
+        st.image(cam_img, caption="Captured — ready to process", use_container_width=True)
+
+
+@st.fragment
+def _render_train_brain(on_save=None):
+    """
+    Train-the-Brain footer row, rendered as a fragment: ticking the checkbox,
+    typing a correction or clicking Save reruns only this row instead of the
+    whole page (calendar, KPIs, check-in lookup, CSS).
+    """
+    # Deferred reset: fragment reruns skip apply_deferred_ui_resets(), so the
+    # post-save clear is also applied here — BEFORE the widgets are created.
+    if st.session_state.get("defer_train_brain_reset"):
+        st.session_state["brain_correction"] = ""
+        st.session_state["brain_bad_response"] = False
+        st.session_state["defer_train_brain_reset"] = False
+
+    st.markdown("<div class='coo-hero-divider'></div>", unsafe_allow_html=True)
+    st.markdown('<div class="coo-train-row">', unsafe_allow_html=True)
+    fL, fM, fR = st.columns([1.2, 3.6, 1.0], gap="small")
+    with fL:
+        st.markdown("<div class='coo-footer-label'>💡 Train the Brain:</div>", unsafe_allow_html=True)
+        st.checkbox("Bad Response?", key="brain_bad_response")
+    with fM:
+        st.text_input(
+            "Input",
+            key="brain_correction",
+            placeholder="Correction (e.g. 'Gym is closed Sundays')",
+            label_visibility="collapsed",
+        )
+    with fR:
+        if st.button("Save", use_container_width=True, key="brain_save"):
+            # The click only reruns this fragment, so the writeback runs here
+            # rather than after render_command_center() in app.py.
+            if callable(on_save):
+                on_save()
+            st.toast("Saved.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # ------------------------------------------------------------
 # RIGHT COLUMN (drafts + schedule)
 # ------------------------------------------------------------
-def render_right_column(drafts, calendar, on_add, on_reject):
-    import streamlit as st
-    import re
-    from datetime import datetime
-
-    def _format_start_any(val) -> str:
-        if isinstance(val, datetime):
-            return val.strftime("%a, %b %d @ %I:%M %p")
-        s = str(val or "").strip()
-        if not s:
-            return "—"
-        s = re.sub(r"([+-]\d{2})(\d{2})$", r"\1:\2", s)
-        s = re.sub(r"\s+([+-]\d{2}:\d{2})$", r"\1", s)
-        if "T" not in s and len(s) >= 19 and s[10] == " ":
-            s = s[:10] + "T" + s[11:]
-        s = s.replace("Z", "+00:00")
-        try:
-            dt = datetime.fromisoformat(s)
-            return dt.strftime("%a, %b %d @ %I:%M %p")
-        except Exception:
-            return str(val)
-
-    # ── Mobile: inject a JS snippet to detect viewport and add class ──
-    # We use a sentinel div approach — no extra Python logic needed.
-    st.markdown("""
+# Viewport script + mobile styles, opened wrapper div; built once at import.
+_RIGHT_COL_HEAD = """
 <script>
 (function(){
     function checkMobile(){
@@ -1279,7 +1317,74 @@ def render_right_column(drafts, calendar, on_add, on_reject):
 }
 </style>
 <div class="coo-right-col-wrap">
-""", unsafe_allow_html=True)
+"""
+
+
+_TZ_OFFSET_NO_COLON_RE = re.compile(r"([+-]\d{2})(\d{2})$")
+_TZ_OFFSET_SPACED_RE = re.compile(r"\s+([+-]\d{2}:\d{2})$")
+
+
+def _format_start_any(val) -> str:
+    # Only strings go through the cache: a malformed draft can carry a dict/list.
+    if isinstance(val, str):
+        return _format_start_str(val)
+    return _format_start_uncached(val)
+
+
+def _format_start_uncached(val) -> str:
+    if isinstance(val, datetime):
+        return val.strftime("%a, %b %d @ %I:%M %p")
+    s = str(val or "").strip()
+    if not s:
+        return "—"
+    s = _TZ_OFFSET_NO_COLON_RE.sub(r"\1:\2", s)
+    s = _TZ_OFFSET_SPACED_RE.sub(r"\1", s)
+    if "T" not in s and len(s) >= 19 and s[10] == " ":
+        s = s[:10] + "T" + s[11:]
+    s = s.replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(s)
+        return dt.strftime("%a, %b %d @ %I:%M %p")
+    except Exception:
+        return str(val)
+
+
+# Pure on its input, and the same start strings come back every rerun.
+_format_start_str = lru_cache(maxsize=256)(_format_start_uncached)
+
+
+def project_events(events) -> dict:
+    """
+    Column-wise display fields for an event list: {"times", "titles", "locs"}.
+    flow.refresh_calendar() builds this once per fetch so the right column's
+    render is plain indexed reads instead of several .get() calls per event.
+    """
+    events = events or []
+    return {
+        "times": [_format_start_any(e.get("start_friendly") or e.get("start_time") or "") for e in events],
+        "titles": [(e.get("title") or "Event").strip() for e in events],
+        "locs": [(e.get("location") or "").strip() for e in events],
+    }
+
+
+def _event_card_html(time_txt: str, title: str, loc: str, extra_cls: str = "") -> str:
+    """Markup for one right-column event card (pure string, no Streamlit)."""
+    cls = f"coo-event-card {extra_cls}" if extra_cls else "coo-event-card"
+    return (
+        f'<div class="{cls}">'
+        f'<div class="coo-evt-time">{time_txt}</div>'
+        f'<div class="coo-evt-title">{title}</div>'
+        f'<div class="coo-evt-loc">📍 {loc or "—"}</div>'
+        f'</div>'
+    )
+
+
+def render_right_column(drafts, calendar, on_add, on_reject, calendar_view=None):
+    import streamlit as st
+
+    # ── Mobile: inject a JS snippet to detect viewport and add class ──
+    # We use a sentinel div approach — no extra Python logic needed.
+    st.markdown(_RIGHT_COL_HEAD, unsafe_allow_html=True)
 
     # ── DRAFTING ──
     st.markdown(
@@ -1290,42 +1395,57 @@ def render_right_column(drafts, calendar, on_add, on_reject):
     if not drafts:
         st.caption("No drafts yet. Type a plan and click Execute.")
     else:
-        for i, d in enumerate(drafts):
-            title = (d.get("title") or "Event").strip()
-            raw_start = d.get("start_friendly") or d.get("start_time") or ""
-            start = _format_start_any(raw_start)
-            loc = (d.get("location") or "").strip()
-            st.markdown(
-                f'<div class="coo-event-card coo-draft">'
-                f'<div class="coo-evt-time">{start}</div>'
-                f'<div class="coo-evt-title">{title}</div>'
-                f'<div class="coo-evt-loc">📍 {loc or "—"}</div>'
-                f'</div>',
-                unsafe_allow_html=True,
-            )
-            c1, c2 = st.columns([1, 1], gap="small")
-            with c1:
-                if st.button("✅ Confirm", key=f"draft_confirm_{i}", use_container_width=True):
-                    on_add(d); st.rerun()
-            with c2:
-                if st.button("❌ Reject", key=f"draft_reject_{i}", use_container_width=True):
-                    on_reject(d); st.rerun()
+        # One grid + two buttons instead of a card and two buttons per draft,
+        # so the widget count stays constant however many drafts the Brain returns.
+        import pandas as pd
+
+        grid = pd.DataFrame([
+            {
+                "pick": False,
+                "when": _format_start_any(d.get("start_friendly") or d.get("start_time") or ""),
+                "title": (d.get("title") or "Event").strip(),
+                "location": (d.get("location") or "").strip() or "—",
+            }
+            for d in drafts
+        ])
+        # Key on the draft set so a stale tick state never maps onto new rows.
+        grid_sig = hash(tuple((d.get("title"), d.get("start_time")) for d in drafts))
+        edited = st.data_editor(
+            grid,
+            key=f"draft_grid_{grid_sig}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["when", "title", "location"],
+            column_config={
+                "pick": st.column_config.CheckboxColumn("✓", width="small"),
+                "when": st.column_config.TextColumn("When"),
+                "title": st.column_config.TextColumn("Event"),
+                "location": st.column_config.TextColumn("📍"),
+            },
+        )
+        picked = [d for d, on in zip(drafts, edited["pick"].tolist()) if on]
+
+        c1, c2 = st.columns([1, 1], gap="small")
+        with c1:
+            if st.button("✅ Confirm", key="draft_confirm_sel", disabled=not picked, use_container_width=True):
+                # Whole selection in one call: one mission-file write, one refresh.
+                on_add(picked)
+                st.rerun()
+        with c2:
+            if st.button("❌ Reject", key="draft_reject_sel", disabled=not picked, use_container_width=True):
+                for d in picked:
+                    on_reject(d)
+                st.rerun()
 
     # ── UPCOMING (next 1 event, always visible) ──
     st.markdown('<div class="coo-sidebar-label">⚡ UPCOMING</div>', unsafe_allow_html=True)
     if not calendar:
         st.caption("No upcoming events.")
     else:
-        e = calendar[0]
-        title = (e.get("title") or "Event").strip()
-        start = _format_start_any(e.get("start_friendly") or e.get("start_time") or "")
-        loc   = (e.get("location") or "").strip()
+        view = calendar_view or project_events(calendar)
+        times, titles, locs = view["times"], view["titles"], view["locs"]
         st.markdown(
-            f'<div class="coo-event-card coo-upcoming">'
-            f'<div class="coo-evt-time">{start}</div>'
-            f'<div class="coo-evt-title">{title}</div>'
-            f'<div class="coo-evt-loc">📍 {loc or "—"}</div>'
-            f'</div>',
+            _event_card_html(times[0], titles[0], locs[0], "coo-upcoming"),
             unsafe_allow_html=True,
         )
 
@@ -1335,18 +1455,14 @@ def render_right_column(drafts, calendar, on_add, on_reject):
         return
 
     with st.expander("📅 Full week calendar", expanded=True):
-        for e in calendar[:8]:
-            title = (e.get("title") or "Event").strip()
-            start = _format_start_any(e.get("start_friendly") or e.get("start_time") or "")
-            loc   = (e.get("location") or "").strip()
-            st.markdown(
-                f'<div class="coo-event-card">'
-                f'<div class="coo-evt-time">{start}</div>'
-                f'<div class="coo-evt-title">{title}</div>'
-                f'<div class="coo-evt-loc">📍 {loc or "—"}</div>'
-                f'</div>',
-                unsafe_allow_html=True,
-            )
+        # One markdown element for the whole list instead of one per card.
+        st.markdown(
+            "".join(
+                _event_card_html(start, title, loc)
+                for start, title, loc in zip(times[:8], titles[:8], locs[:8])
+            ),
+            unsafe_allow_html=True,
+        )
 
     st.markdown('</div>', unsafe_allow_html=True)  # close coo-right-col-wrap
 
@@ -4,6 +4,9 @@ import os
 import uuid
 import datetime as dt
 import re
+import time
+from functools import lru_cache
+from itertools import islice
 from typing import Any, Dict, List, Optional
 from dateutil import parser as dtparser
 
@@ -46,6 +49,7 @@ def set_active_user(user_id: str) -> None:
 
 # --- NEW: per-user memory folder (Layer B) ---
 USER_MEMORY_DIR = "memory/users"
+_UNSAFE_KEY_RUN_RE = re.compile(r"[^a-z0-9]+")
 
 def _safe_user_key(user_id: str) -> str:
     """
@@ -55,7 +59,7 @@ def _safe_user_key(user_id: str) -> str:
     s = (user_id or "").strip().lower()
     if not s:
         return "unknown_user"
-    s = re.sub(r"[^a-z0-9]+", "_", s).strip("_")
+    s = _UNSAFE_KEY_RUN_RE.sub("_", s).strip("_")
     return s or "unknown_user"
 
 def safe_email_from_user(user_id: str) -> str:
@@ -111,13 +115,18 @@ def append_user_memory_entry(user_id: str, entry: Dict[str, Any], max_items: int
 
         # Dedupe only if structured fields exist
         if kind and key and value:
+            # Compare value first: it differs on nearly every row, so most rows
+            # are rejected before kind/key are normalized. Rows come from JSON,
+            # so an exact type() check is enough to skip non-dict junk.
             for r in reversed(rows[-200:]):  # small window is enough
-                if not isinstance(r, dict):
+                if type(r) is not dict:
+                    continue
+                rv = r.get("value")
+                if rv != value and str(rv or "").strip() != value:
                     continue
                 if (
-                    str(r.get("kind") or "").strip().lower() == kind
-                    and str(r.get("key") or "").strip().lower() == key
-                    and str(r.get("value") or "").strip() == value
+                    str(r.get("key") or "").strip().lower() == key
+                    and str(r.get("kind") or "").strip().lower() == kind
                 ):
                     return False  # already stored
 
@@ -136,6 +145,9 @@ def append_user_memory_entry(user_id: str, entry: Dict[str, Any], max_items: int
     except Exception:
         return False
 
+_MEMORY_TAG_RE = re.compile(r"\[\[MEMORY:(\{.*?\})\]\]", flags=re.DOTALL)
+
+
 def parse_memory_tags(pre_prep: str) -> List[dict]:
     """
     Extract [[MEMORY:{...json...}]] blocks from pre_prep.
@@ -143,14 +155,13 @@ def parse_memory_tags(pre_prep: str) -> List[dict]:
     """
     out = []
     s = str(pre_prep or "")
-    if not s:
+    if "[[MEMORY:" not in s:  # most replies carry no tag — skip the regex walk
         return out
 
-    # non-greedy json capture
-    matches = re.findall(r"\[\[MEMORY:(\{.*?\})\]\]", s, flags=re.DOTALL)
-    for m in matches[:3]:  # hard cap
+    # non-greedy json capture; finditer + islice stops scanning at the cap
+    for m in islice(_MEMORY_TAG_RE.finditer(s), 3):  # hard cap
         try:
-            payload = json.loads(m)
+            payload = json.loads(m.group(1))
             if isinstance(payload, dict):
                 out.append(payload)
         except Exception:
@@ -200,12 +211,48 @@ def init_files():
                 json.dump([], f)
 
 
-def _read_json(path: str) -> list:
+# Parsed-file cache: path -> ((mtime_ns, size), rows).
+# A single rerun reads the same feedback/mission logs several times (KPIs,
+# reliability, check-in, page context). Re-parse only when the file on disk
+# actually changed; _write_json() keeps the entry in sync (write-through).
+_JSON_CACHE: Dict[str, tuple] = {}
+
+
+def _file_sig(path: str) -> tuple:
+    st_ = os.stat(path)
+    return (st_.st_mtime_ns, st_.st_size)
+
+
+def _copy_json(val):
+    # JSON-only deep copy: dicts and lists are rebuilt, scalars are immutable.
+    # Far cheaper than copy.deepcopy, which memoizes every object it visits.
+    if isinstance(val, dict):
+        return {k: _copy_json(v) for k, v in val.items()}
+    if isinstance(val, list):
+        return [_copy_json(v) for v in val]
+    return val
+
+
+def _copy_rows(rows: list) -> list:
+    # Full copies: callers mutate rows in place (status, snoozed_until, nested
+    # lists such as tags) before writing back, and must never touch the cache.
+    return [_copy_json(r) for r in rows]
+
+
+def _read_json(path: str, tail: Optional[int] = None) -> list:
+    """Rows of a JSON log; tail=N copies only the last N rows out of the cache."""
     init_files()
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
+        sig = _file_sig(path)
+        hit = _JSON_CACHE.get(path)
+        if hit is not None and hit[0] == sig:
+            data = hit[1]
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data = data if isinstance(data, list) else []
+            _JSON_CACHE[path] = (sig, data)
+        return _copy_rows(data[-tail:] if tail else data)
     except Exception:
         return []
 
@@ -215,8 +262,9 @@ def _write_json(path: str, data: list) -> None:
     try:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4)
+        _JSON_CACHE[path] = (_file_sig(path), _copy_rows(data))
     except Exception:
-        pass
+        _JSON_CACHE.pop(path, None)
 
 
 # -----------------------
@@ -227,6 +275,16 @@ def _now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
 
 
+@lru_cache(maxsize=1)
+def _app_tz() -> dt.tzinfo:
+    """America/New_York, resolved once (fixed EST offset if zoneinfo is missing)."""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo("America/New_York")
+    except ImportError:
+        return dt.timezone(dt.timedelta(hours=-5))  # EST fallback
+
+
 def _parse_dt(value: Optional[str]) -> Optional[dt.datetime]:
     """
     Parse common Google Calendar formats into timezone-aware datetime (UTC).
@@ -248,16 +306,15 @@ def _parse_dt(value: Optional[str]) -> Optional[dt.datetime]:
                 # Treat naive datetimes as America/New_York.
                 # brain.py creates event times in Eastern time (no TZ suffix).
                 # Treating them as UTC would make "7 PM" appear past on a UTC server.
-                try:
-                    from zoneinfo import ZoneInfo
-                    _app_tz = ZoneInfo("America/New_York")
-                except ImportError:
-                    _app_tz = dt.timezone(dt.timedelta(hours=-5))  # EST fallback
-                dtx = dtx.replace(tzinfo=_app_tz)
+                dtx = dtx.replace(tzinfo=_app_tz())
             return dtx.astimezone(dt.timezone.utc)
 
-        # All-day date: treat as end-of-day UTC
-        d = dt.datetime.strptime(s, "%Y-%m-%d").date()
+        # All-day date: treat as end-of-day UTC. Plain "YYYY-MM-DD" (what
+        # Google sends) skips strptime's format-string parsing.
+        if len(s) == 10 and s[4] == "-" and s[7] == "-":
+            d = dt.date.fromisoformat(s)
+        else:
+            d = dt.datetime.strptime(s, "%Y-%m-%d").date()
         return dt.datetime(d.year, d.month, d.day, 23, 59, 59, tzinfo=dt.timezone.utc)
     except Exception:
         # Best-effort fallback with dateutil
@@ -276,8 +333,7 @@ def _parse_dt(value: Optional[str]) -> Optional[dt.datetime]:
 # -----------------------
 def load_memory(limit=10):
     """Loads actionable learnings for the Brain."""
-    data = _read_json(MEMORY_FILE)
-    return data[-limit:]
+    return _read_json(MEMORY_FILE, tail=limit)
 
 
 def load_feedback_rows() -> List[dict]:
@@ -288,6 +344,18 @@ def load_feedback_rows() -> List[dict]:
     return _read_json(MEMORY_FILE)
 
 
+def count_memory() -> int:
+    """Number of feedback rows, without copying them out of the parse cache."""
+    try:
+        hit = _JSON_CACHE.get(MEMORY_FILE)
+        if hit is None or hit[0] != _file_sig(MEMORY_FILE):
+            _read_json(MEMORY_FILE)
+            hit = _JSON_CACHE.get(MEMORY_FILE)
+        return len(hit[1]) if hit else 0
+    except Exception:
+        return 0
+
+
 def save_manual_feedback(topic, feedback, rating, user_id=None):
     entry = {
         "timestamp": "Manual",
@@ -305,10 +373,7 @@ def save_manual_feedback(topic, feedback, rating, user_id=None):
 # -----------------------
 # MISSIONS (FOLLOW-UP / MISSED EVENTS)
 # -----------------------
-def log_mission_start(event_data):
-    """Logs a mission so we can check on it later."""
-    init_files()
-
+def _new_mission(event_data) -> dict:
     source_id = event_data.get("source_id") or event_data.get("id")
     title = event_data.get("title") or event_data.get("summary") or "Event"
 
@@ -319,7 +384,7 @@ def log_mission_start(event_data):
     end_dt = _parse_dt(end_time_raw) if end_time_raw else None
     end_time = end_dt.isoformat() if end_dt else end_time_raw
 
-    new_mission = {
+    return {
         "id": str(uuid.uuid4())[:8],
         "source_id": source_id,
         "title": title,
@@ -328,11 +393,26 @@ def log_mission_start(event_data):
         "snoozed_until": None,
     }
 
+
+def log_mission_start(event_data):
+    """Logs a mission so we can check on it later."""
+    return log_mission_start_batch([event_data])[0]
+
+
+def log_mission_start_batch(events: List[Dict[str, Any]]) -> List[dict]:
+    """
+    Logs several missions with a single read + rewrite of the mission file.
+    Calling log_mission_start() in a loop re-serializes the whole log per event.
+    """
+    new_missions = [_new_mission(ev) for ev in (events or [])]
+    if not new_missions:
+        return []
+
     missions = _read_json(MISSION_FILE)
-    missions.append(new_mission)
+    missions.extend(new_missions)
     _write_json(MISSION_FILE, missions)
 
-    return new_mission
+    return new_missions
 
 
 def upsert_calendar_missions(events: List[Dict[str, Any]]) -> None:
@@ -379,11 +459,34 @@ def upsert_calendar_missions(events: List[Dict[str, Any]]) -> None:
         _write_json(MISSION_FILE, missions)
 
 
+# get_pending_review() runs on every rerun (check-in strip) and re-parses every
+# mission's end/snooze time. Reuse the answer while the mission file is
+# unchanged — any write (review, snooze, new mission) changes its signature —
+# and for at most 30 s, since the answer also moves with the clock.
+_PENDING_TTL_S = 30
+_PENDING_CACHE: Dict[str, tuple] = {}
+
+
 def get_pending_review():
     """
     Picks ONE missed (pending + past end_time + not snoozed) mission to ask about.
     Returns mission dict or None.
     """
+    path = MISSION_FILE
+    try:
+        sig = _file_sig(path)
+    except OSError:
+        sig = None
+    hit = _PENDING_CACHE.get(path)
+    if hit is not None and sig is not None and hit[0] == sig and time.monotonic() - hit[1] < _PENDING_TTL_S:
+        return dict(hit[2]) if hit[2] else None
+
+    mission = _find_pending_review()
+    _PENDING_CACHE[path] = (sig, time.monotonic(), mission)
+    return dict(mission) if mission else None
+
+
+def _find_pending_review():
     missions = _read_json(MISSION_FILE)
     now = _now_utc()
 
@@ -411,9 +514,8 @@ def get_pending_review():
     if not candidates:
         return None
 
-    # Most recent missed first
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    return candidates[0][1]
+    # Most recent missed first — only the top one is needed, no full sort
+    return max(candidates, key=lambda x: x[0])[1]
 
 
 def get_missed_count() -> int:
@@ -709,7 +811,25 @@ def get_ideas_summary(safe_email: str, n: int = 10) -> list:
 # ###############################################
 # Improvement 1: Contextual Matching (Very Powerful)
 # ###############################################
-import re
+# Request cues in one alternation; finditer's group names say which fired.
+_IDEA_CUES_RE = re.compile(
+    r"\b(?:"
+    r"(?P<short>short|quick|brief|1-2 hours|couple hours)"
+    r"|(?P<outdoor>outdoor|outside|park|trail|beach|river|lake|kayak|kayaking|walk)"
+    r"|(?P<indoor>indoor|inside|museum|mall|movie|bowling|aquarium)"
+    r"|(?P<afternoon>afternoon|2pm|3pm|4pm)"
+    r"|(?P<morning>morning|8am|9am|10am|breakfast)"
+    r")\b"
+)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=512)
+def _idea_text_tokens(raw: str) -> tuple:
+    """(normalized text, word set) for an idea — tokenized once per distinct text."""
+    text = " ".join(raw.lower().split())
+    return text, frozenset(w for w in _WORD_RE.findall(text) if len(w) >= 3)
+
 
 def select_relevant_ideas(ideas: list, user_request: str, n: int = 6) -> list:
     """
@@ -720,22 +840,20 @@ def select_relevant_ideas(ideas: list, user_request: str, n: int = 6) -> list:
     t = " ".join((user_request or "").lower().split())
 
     # Extract simple intent signals
-    wants_short = bool(re.search(r"\b(short|quick|brief|1-2 hours|couple hours)\b", t))
-    wants_outdoor = bool(re.search(r"\b(outdoor|outside|park|trail|beach|river|lake|kayak|kayaking|walk)\b", t))
-    wants_indoor = bool(re.search(r"\b(indoor|inside|museum|mall|movie|bowling|aquarium)\b", t))
-    mentions_sun = bool(re.search(r"\b(sunday|sun)\b", t))
-    mentions_sat = bool(re.search(r"\b(saturday|sat)\b", t))
-    mentions_afternoon = bool(re.search(r"\b(afternoon|2pm|3pm|4pm)\b", t))
-    mentions_morning = bool(re.search(r"\b(morning|8am|9am|10am|breakfast)\b", t))
+    cues = {m.lastgroup for m in _IDEA_CUES_RE.finditer(t)}
+    wants_short = "short" in cues
+    wants_outdoor = "outdoor" in cues
+    wants_indoor = "indoor" in cues
+    mentions_afternoon = "afternoon" in cues
+    mentions_morning = "morning" in cues
 
     # Keywords from request for overlap scoring
-    req_tokens = set([w for w in re.findall(r"[a-z0-9]+", t) if len(w) >= 3])
+    req_tokens = _idea_text_tokens(t)[1]
 
     def score_item(it: dict) -> float:
-        text = " ".join(((it.get("text") or "") + " " + " ".join(it.get("tags") or [])).lower().split())
-        tokens = set([w for w in re.findall(r"[a-z0-9]+", text) if len(w) >= 3])
+        text, tokens = _idea_text_tokens((it.get("text") or "") + " " + " ".join(it.get("tags") or []))
 
-        overlap = len(req_tokens.intersection(tokens))
+        overlap = len(req_tokens & tokens)
         s = overlap * 2.0
 
         # Light boosts